@@ -0,0 +1,52 @@
+# backtest.py
+import os
+
+from panel import Panel, compute_indicators
+from strategy import simulate_universe
+
+
+def backtest_universe(frames, asset_config, halflife, signal_smooth_halflife, slope_window,
+                      volatility_stop_multiplier, require_positive_signal,
+                      enable_trailing_take_profit=True, take_profit_trigger=0.10,
+                      take_profit_fraction=0.50, panel_dtype="float64", panel_dir=None,
+                      panel_block_size=256, max_workers=None, store=None):
+    # Headless main.py flow for downloaded {symbol: OHLC frame}: close/open
+    # panels, indicators, then one strategy run per symbol in asset_config.
+    # Strategy runs already in `store` (a result_store.ResultStore) are reused.
+    # Returns (close Panel, open Panel, indicator Panels, [(TradeLog, payload)]).
+    price_close = Panel.from_frames(frames, "Close", dtype=panel_dtype,
+                                    path=panel_dir and os.path.join(panel_dir, "close"))
+    price_open = Panel.from_frames(frames, "Open", dtype=panel_dtype,
+                                   path=panel_dir and os.path.join(panel_dir, "open"))
+
+    # --- Calculations based on CLOSE prices, one block of symbols at a time ---
+    indicators = compute_indicators(
+        price_close, halflife, signal_smooth_halflife, slope_window,
+        block_size=panel_block_size, directory=panel_dir,
+        names=("volatility", "smoothed_signal", "slope"),
+    )
+    ewma_volatility = indicators["volatility"]
+    smoothed_signal = indicators["smoothed_signal"]
+    slope_data = indicators["slope"]
+
+    warmup = max(halflife, signal_smooth_halflife, slope_window)
+
+    # --- Run strategy with dynamic stop-loss, one process per symbol ---
+    # Volatility-based stop-loss: a daily % stop-loss value per asset
+    tasks = [
+        dict(
+            symbol=symbol,
+            price_series=price_open[symbol].iloc[warmup:],   # EXECUTION at OPEN
+            signal_series=smoothed_signal[symbol].iloc[warmup:], # SIGNAL from CLOSE
+            slope_series=slope_data[symbol].iloc[warmup:],
+            stop_loss_series=volatility_stop_multiplier * ewma_volatility[symbol].iloc[warmup:],
+            initial_capital=config["initial_capital"],
+            require_positive_signal=require_positive_signal,
+            enable_trailing_take_profit=enable_trailing_take_profit,
+            take_profit_trigger=take_profit_trigger,
+            take_profit_fraction=take_profit_fraction
+        )
+        for symbol, config in asset_config.items()
+    ]
+    results = simulate_universe(tasks, max_workers=max_workers, store=store)
+    return price_close, price_open, indicators, results
@@ -0,0 +1,132 @@
+# benchmark.py
+import argparse
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import jit
+from data import price_panel
+from indicators import rolling_slope
+from signal_engine import compute_signals
+from strategy import simulate_strategy
+from summary import summarize_trades, symbol_stats
+from synthetic import synthetic_universe
+from trades import TradeLog
+
+
+def _time(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def benchmark_case(n_bars, n_symbols, repeat=5, seed=0, freq="B", halflife=100,
+                   signal_smooth_halflife=100, slope_window=50, volatility_stop_multiplier=8):
+    # Times each pipeline stage on one synthetic universe; returns result rows
+    frames = synthetic_universe(n_symbols, n_bars, seed=seed, freq=freq)
+    close = price_panel(frames, "Close")
+    open_ = price_panel(frames, "Open")
+    warmup = max(halflife, signal_smooth_halflife, slope_window)
+
+    def indicators():
+        # The production path (main.py, dashboard, pipeline): one fused pass
+        out = compute_signals(close, halflife, signal_smooth_halflife, slope_window,
+                              outputs=("volatility", "smoothed_signal"))
+        return out["volatility"], out["smoothed_signal"]
+
+    (volatility, smoothed), t_indicators = _time(indicators, repeat)
+    slope, t_slope = _time(lambda: rolling_slope(smoothed, slope_window), repeat)
+
+    def strategy():
+        return TradeLog.concat([
+            simulate_strategy(
+                symbol=symbol,
+                price_series=open_[symbol].iloc[warmup:],
+                signal_series=smoothed[symbol].iloc[warmup:],
+                slope_series=slope[symbol].iloc[warmup:],
+                stop_loss_series=(volatility_stop_multiplier * volatility[symbol]).iloc[warmup:],
+                initial_capital=10000,
+                require_positive_signal=False,
+                enable_trailing_take_profit=True,
+            )[0]
+            for symbol in close.columns
+        ])
+
+    strategy()  # compile the numba kernel outside the timings
+    trades, t_strategy = _time(strategy, repeat)
+
+    asset_config = {symbol: {"initial_capital": 10000} for symbol in close.columns}
+
+    def summary():
+        summary_df, _ = summarize_trades(trades, asset_config, verbose=False)
+        return symbol_stats(summary_df)
+
+    _, t_summary = _time(summary, repeat)
+
+    rows = []
+    for stage, timings in (
+        ("indicators", t_indicators),
+        ("rolling_slope", t_slope),
+        ("run_strategy", t_strategy),
+        ("summarize_trades", t_summary),
+    ):
+        rows.append({
+            "stage": stage,
+            "bars": n_bars,
+            "symbols": n_symbols,
+            "trades": len(trades),
+            "repeat": repeat,
+            "median_s": statistics.median(timings),
+            "min_s": min(timings),
+        })
+    return rows
+
+
+def environment():
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "numba": jit.NUMBA_AVAILABLE,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time each pipeline stage on synthetic data.")
+    parser.add_argument("--bars", type=int, nargs="+", default=[6500, 100000])
+    parser.add_argument("--symbols", type=int, nargs="+", default=[1, 50])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--freq", default="B", help="bar frequency, e.g. B or min")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args(argv)
+
+    # Time the steady state: load the numba kernels on first use
+    jit.NUMBA_MIN_WORK = 0
+    results = []
+    for n_bars in args.bars:
+        for n_symbols in args.symbols:
+            for row in benchmark_case(n_bars, n_symbols, repeat=args.repeat,
+                                      seed=args.seed, freq=args.freq):
+                results.append(row)
+                print(f"{row['stage']:<18} bars={n_bars:<8} symbols={n_symbols:<5} "
+                      f"median={row['median_s'] * 1000:9.2f} ms")
+
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+# cli.py
+import argparse
+import json
+import os
+import sys
+import time
+
+# Heavy modules (pandas, numba, matplotlib, yfinance) are imported inside the
+# commands that need them so `--help` and config errors return immediately.
+
+STRATEGY_KEYS = (
+    "halflife", "signal_smooth_halflife", "slope_window", "volatility_stop_multiplier",
+    "require_positive_signal", "enable_trailing_take_profit", "take_profit_trigger",
+    "take_profit_fraction",
+)
+RUN_KEYS = STRATEGY_KEYS + (
+    "name", "symbols", "initial_capital", "start_date", "end_date", "cache_dir",
+    "download_workers", "download_retries", "strategy_workers",
+    "panel_dtype", "panel_dir", "panel_block_size",
+    "portfolio_allocation", "portfolio_rebalance", "portfolio_cost_bps",
+)
+
+
+# --- Run configurations ---
+
+def load_config(path):
+    # JSON or TOML (by extension) with an optional "defaults" table and a list
+    # of "runs"; a file without "runs" is a single run
+    if path.endswith(".toml"):
+        import tomllib
+        with open(path, "rb") as f:
+            raw = tomllib.load(f)
+    else:
+        with open(path) as f:
+            raw = json.load(f)
+    defaults = raw.get("defaults", {})
+    runs = raw.get("runs", [{key: value for key, value in raw.items() if key != "defaults"}])
+    return [expand_run(defaults, run, i) for i, run in enumerate(runs)]
+
+
+def expand_run(defaults, run, position=0):
+    # config.py values, then the file's defaults, then the run itself
+    import config
+
+    merged = {key: getattr(config, key) for key in RUN_KEYS if hasattr(config, key)}
+    merged.update(defaults)
+    merged.update(run)
+    unknown = set(merged) - set(RUN_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown run setting(s): {sorted(unknown)}")
+    merged.setdefault("name", f"run{position:03d}")
+    merged.setdefault("initial_capital", 10000)
+
+    # symbols: a list (shared initial_capital) or {symbol: initial_capital};
+    # config.asset_config when missing
+    symbols = merged.get("symbols") or config.asset_config
+    if isinstance(symbols, dict):
+        merged["asset_config"] = {
+            symbol: value if isinstance(value, dict) else {"initial_capital": value}
+            for symbol, value in symbols.items()
+        }
+    else:
+        merged["asset_config"] = {
+            symbol: {"initial_capital": merged["initial_capital"]} for symbol in symbols
+        }
+    merged.pop("symbols", None)
+    return merged
+
+
+# --- Output ---
+
+def _json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def write_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, default=_json_default)
+    os.replace(tmp, path)
+
+
+def write_trades(trades, directory, fmt):
+    frame = trades.to_frame().astype({"symbol": str, "exit_reason": str})
+    if fmt == "parquet":
+        path = os.path.join(directory, "trades.parquet")
+        frame.to_parquet(path, index=False)
+    else:
+        path = os.path.join(directory, "trades.json")
+        frame.to_json(path, orient="records", date_format="iso", indent=2)
+    return path
+
+
+def _records(frame):
+    frame = frame.reset_index()
+    return [
+        {key: None if value != value else value for key, value in row.items()}
+        for row in frame.to_dict("records")
+    ]
+
+
+def save_chart(results, path):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from plotting import plot_strategy
+
+    fig, axes = plt.subplots(3, 1, figsize=(14, 12), sharex=True,
+                             gridspec_kw={'height_ratios': [2, 1.5, 1]})
+    for _, payload in results:
+        plot_strategy(payload, *axes)
+    for ax in axes:
+        ax.legend()
+        ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+# --- Commands ---
+
+def execute_run(run, output_dir, fmt, source=None, plot=False, store=None):
+    from backtest import backtest_universe
+    from data import download_universe
+    from portfolio import portfolio_metrics, simulate_portfolio
+    from summary import symbol_stats
+    from trades import TradeLog
+
+    started = time.perf_counter()
+    asset_config = run["asset_config"]
+    frames, failures = download_universe(
+        list(asset_config), run["start_date"], run["end_date"], cache_dir=run.get("cache_dir"),
+        source=source, max_workers=run.get("download_workers", 8),
+        retries=run.get("download_retries", 2),
+    )
+    if not frames:
+        raise RuntimeError(f"run {run['name']!r}: no price data for any symbol")
+    asset_config = {symbol: value for symbol, value in asset_config.items() if symbol in frames}
+    price_close, price_open, _, results = backtest_universe(
+        frames, asset_config,
+        **{key: run[key] for key in STRATEGY_KEYS},
+        panel_dtype=run.get("panel_dtype", "float64"), panel_dir=run.get("panel_dir"),
+        panel_block_size=run.get("panel_block_size", 256),
+        max_workers=run.get("strategy_workers"), store=store,
+    )
+    trades = TradeLog.concat([log for log, _ in results])
+
+    directory = os.path.join(output_dir, run["name"])
+    os.makedirs(directory, exist_ok=True)
+    trades_path = write_trades(trades, directory, fmt)
+
+    daily, _ = simulate_portfolio(
+        trades, price_open.to_frame(), price_close.to_frame(), asset_config,
+        allocation=run.get("portfolio_allocation", "capital"),
+        rebalance=run.get("portfolio_rebalance"), cost_bps=run.get("portfolio_cost_bps", 0.0),
+    )
+    metrics = {
+        "run": {key: value for key, value in run.items() if key != "asset_config"},
+        "asset_config": asset_config,
+        "failed_downloads": failures,
+        "trades": len(trades),
+        "symbols": _records(symbol_stats(trades.to_frame())) if len(trades) else [],
+        "portfolio": portfolio_metrics(daily["equity"]),
+        "seconds": time.perf_counter() - started,
+    }
+    write_json(os.path.join(directory, "metrics.json"), metrics)
+    if plot:
+        save_chart(results, os.path.join(directory, "chart.png"))
+    return {"name": run["name"], "trades_file": trades_path, "trades": len(trades),
+            **{f"portfolio_{k}": v for k, v in metrics["portfolio"].items()}}
+
+
+def cmd_run(args):
+    runs = load_config(args.config)
+    if args.only:
+        runs = [run for run in runs if run["name"] in args.only]
+    fmt = args.format
+    if fmt is None:
+        from data import CACHE_FORMAT
+        fmt = "parquet" if CACHE_FORMAT == "parquet" else "json"
+
+    source = None
+    if args.source_dir:
+        from data import file_source
+        source = file_source(args.source_dir)
+    elif args.synthetic:
+        from synthetic import synthetic_source
+        source = synthetic_source()
+
+    store = None
+    if args.store is not None:
+        import config
+        from result_store import ResultStore
+        store = ResultStore(args.store or config.result_store_dir,
+                            max_bytes=config.result_store_max_mb * 2 ** 20)
+
+    os.makedirs(args.output, exist_ok=True)
+    summary = []
+    for run in runs:
+        if args.workers is not None:
+            run["strategy_workers"] = args.workers
+        row = execute_run(run, args.output, fmt, source=source, plot=args.plot, store=store)
+        summary.append(row)
+        if not args.quiet:
+            print(f"{row['name']}: {row['trades']} trades, "
+                  f"return {row['portfolio_return_pct']:.2f}%, "
+                  f"max drawdown {row['portfolio_max_drawdown_pct']:.2f}% -> {row['trades_file']}")
+    write_json(os.path.join(args.output, "runs.json"), summary)
+    return 0
+
+
+def _symbols_arg(args):
+    symbols = list(args.symbols or [])
+    if args.symbols_file:
+        with open(args.symbols_file) as f:
+            symbols += [line.split("#")[0].strip() for line in f]
+    symbols = [symbol for symbol in dict.fromkeys(symbols) if symbol]
+    if not symbols:
+        import config
+        symbols = list(config.asset_config)
+    return symbols
+
+
+def cmd_scan(args):
+    import config
+    import pandas as pd
+    from data import download_universe
+    from panel import Panel
+    from scanner import print_scan, scan_lookback, scan_universe
+
+    symbols = _symbols_arg(args)
+    lookback = args.lookback or scan_lookback(
+        config.halflife, config.signal_smooth_halflife, config.slope_window
+    )
+    # Daily bars: ~7/5 calendar days per bar, plus slack for holidays
+    end = pd.Timestamp(args.end) if args.end else pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+    start = end - pd.Timedelta(days=int(lookback * 7 / 5) + 30)
+
+    source = None
+    if args.source_dir:
+        from data import file_source
+        source = file_source(args.source_dir)
+    elif args.synthetic:
+        from synthetic import synthetic_source
+        source = synthetic_source()
+    frames, failures = download_universe(symbols, start, end, cache_dir=config.cache_dir,
+                                         source=source, max_workers=args.workers,
+                                         retries=config.download_retries)
+    if not frames:
+        print("No price data for any symbol.", file=sys.stderr)
+        return 1
+
+    # Union calendar, so one symbol's holidays don't hide the others' last bar
+    index = pd.DatetimeIndex(sorted(set().union(*(frame.index for frame in frames.values()))))
+    close = Panel.empty(index, list(frames))
+    for j, frame in enumerate(frames.values()):
+        close.write_block(j, frame["Close"].reindex(index).to_frame())
+
+    result = scan_universe(
+        close, config.halflife, config.signal_smooth_halflife, config.slope_window,
+        top_k=args.top, rank_by=args.rank_by, lookback=lookback,
+    )
+    if not args.quiet:
+        print_scan(result, args.rank_by)
+        if failures:
+            print(f"\nNo data: {', '.join(failures)}")
+    if args.output:
+        write_json(args.output, {
+            "date": result["date"],
+            "symbols": len(result["state"]),
+            "missing": failures,
+            "crossings": _records(result["crossings"]),
+            "top": _records(result["top"]),
+        })
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Batch backtests from run configuration files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run every configuration in a JSON/TOML file")
+    run.add_argument("config", help="run configuration (.json or .toml)")
+    run.add_argument("-o", "--output", default="results", help="output directory")
+    run.add_argument("--format", choices=["parquet", "json"], default=None,
+                     help="trade file format (default: parquet when pyarrow is installed)")
+    run.add_argument("--only", nargs="+", help="run names to execute")
+    run.add_argument("--workers", type=int, default=None, help="strategy processes per run")
+    source = run.add_mutually_exclusive_group()
+    source.add_argument("--source-dir", help="read <symbol>.parquet/.csv files instead of downloading")
+    source.add_argument("--synthetic", action="store_true", help="use synthetic prices (offline)")
+    run.add_argument("--plot", action="store_true", help="also save chart.png per run")
+    run.add_argument("--store", nargs="?", const="", default=None, metavar="DIR",
+                     help="reuse and save backtest results in a result store "
+                          "(default DIR: config.result_store_dir)")
+    run.add_argument("-q", "--quiet", action="store_true")
+    run.set_defaults(func=cmd_run)
+
+    scan = commands.add_parser("scan", help="rank a universe by its current slope-crossing state")
+    scan.add_argument("symbols", nargs="*", help="symbols to scan (default: asset_config)")
+    scan.add_argument("--symbols-file", help="file with one symbol per line")
+    scan.add_argument("--top", type=int, default=20, help="how many symbols to rank")
+    scan.add_argument("--rank-by", choices=["smoothed_signal", "slope"], default="smoothed_signal")
+    scan.add_argument("--lookback", type=int, default=None,
+                      help="bars of history per symbol (default: scanner.scan_lookback, "
+                           "dropping < 1e-6 of the EWM weight; signals then match a "
+                           "full-history run to ~1e-9 of the largest signal)")
+    scan.add_argument("--end", default=None, help="scan as of this date (exclusive; default: today)")
+    scan.add_argument("--workers", type=int, default=8, help="download threads")
+    scan.add_argument("-o", "--output", default=None, help="write crossings and top-k as JSON")
+    source = scan.add_mutually_exclusive_group()
+    source.add_argument("--source-dir", help="read <symbol>.parquet/.csv files instead of downloading")
+    source.add_argument("--synthetic", action="store_true", help="use synthetic prices (offline)")
+    scan.add_argument("-q", "--quiet", action="store_true")
+    scan.set_defaults(func=cmd_scan)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,3 +26,47 @@ halflife = 100
 signal_smooth_halflife = 100
 slope_window = 50
 require_positive_signal = False
+
+# Local price cache (set to None to always download the full range)
+cache_dir = ".price_cache"
+
+# On-disk backtest results keyed by the aligned strategy inputs + parameters,
+# shared by main.py, the dashboard and `cli.py run --store` (set to None to
+# disable), and its size cap in MB
+result_store_dir = ".result_store"
+result_store_max_mb = 512
+
+# Parallelism for main.py: download threads / retries and strategy processes
+download_workers = 8
+download_retries = 2
+strategy_workers = None  # None = one per CPU
+
+# Block-bootstrap robustness check in main.py (0 paths disables it)
+monte_carlo_paths = 0
+monte_carlo_block = 20  # mean block length in bars
+
+# Price / indicator panels: storage dtype ("float32" halves memory), an optional
+# directory for memory-mapped panel files, and symbols per indicator block
+panel_dtype = "float64"
+panel_dir = None
+panel_block_size = 256
+
+# Shared-capital portfolio in main.py: "capital" (fixed slices sized by
+# initial_capital) or "equal" (split across open positions), an optional
+# calendar rebalance ("W", "M", "Q"; None = only when positions change) and
+# transaction costs in basis points of traded value
+portfolio_allocation = "capital"
+portfolio_rebalance = None
+portfolio_cost_bps = 0.0
+
+# Instrumentation for main.py: per-stage timings (and tracemalloc peaks) printed
+# at the end, and an optional cProfile dump for deep dives
+profile = False
+profile_memory = False
+profile_output = None  # e.g. "main.prof"
+
+# service.py: bind address and seconds between background refreshes of every
+# warm symbol
+service_host = "127.0.0.1"
+service_port = 8080
+service_refresh_seconds = 60
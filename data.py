@@ -1,7 +1,186 @@
 # data.py
-import yfinance as yf
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 
-def download_price_data(symbol, start_date, end_date):
+from profiling import timed
+
+log = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ["Close", "Open"]
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = "parquet"
+except ImportError:  # pyarrow is optional, fall back to pickle files
+    CACHE_FORMAT = "pickle"
+
+
+# --- Price sources: callables (symbol, start_date, end_date) -> DataFrame ---
+
+def _normalize(data):
+    if isinstance(data.columns, pd.MultiIndex):
+        data = data.copy()
+        data.columns = data.columns.get_level_values(0)
+    return data[PRICE_COLUMNS].dropna()
+
+def yahoo_source(symbol, start_date, end_date):
+    import yfinance as yf
     data = yf.download(symbol, start=start_date, end=end_date, auto_adjust=True)
-    return data[["Close", "Open"]].dropna()
+    return _normalize(data)
+
+def file_source(directory):
+    # Offline source reading <directory>/<symbol>.parquet or <symbol>.csv
+    def source(symbol, start_date, end_date):
+        base = os.path.join(directory, _file_name(symbol))
+        if os.path.exists(base + ".parquet"):
+            data = pd.read_parquet(base + ".parquet")
+        else:
+            data = pd.read_csv(base + ".csv", index_col=0, parse_dates=True)
+        return _normalize(_slice(data, pd.Timestamp(start_date), pd.Timestamp(end_date)))
+    return source
+
+
+# --- On-disk cache keyed by symbol ---
+
+def _file_name(symbol):
+    return symbol.replace("/", "_").replace(os.sep, "_")
+
+def _slice(data, start, end):
+    # Half-open [start, end) like yf.download
+    return data[(data.index >= start) & (data.index < end)]
+
+def _cache_paths(cache_dir, symbol):
+    base = os.path.join(cache_dir, _file_name(symbol))
+    return base + "." + CACHE_FORMAT, base + ".json"
+
+def _read_cache(cache_dir, symbol):
+    data_path, meta_path = _cache_paths(cache_dir, symbol)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if CACHE_FORMAT == "parquet":
+        data = pd.read_parquet(data_path)
+    else:
+        data = pd.read_pickle(data_path)
+    return data, (pd.Timestamp(meta["start"]), pd.Timestamp(meta["end"]))
+
+def _write_cache(cache_dir, symbol, data, covered):
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = _cache_paths(cache_dir, symbol)
+    # Write to temp files and rename so concurrent readers never see partial files
+    tmp_data, tmp_meta = data_path + f".{os.getpid()}.tmp", meta_path + f".{os.getpid()}.tmp"
+    if CACHE_FORMAT == "parquet":
+        data.to_parquet(tmp_data)
+    else:
+        data.to_pickle(tmp_data)
+    with open(tmp_meta, "w") as f:
+        json.dump({"start": str(covered[0].date()), "end": str(covered[1].date())}, f)
+    os.replace(tmp_data, data_path)
+    os.replace(tmp_meta, meta_path)
+
+def _received_end(data, coverable_end):
+    # Covered up to the day after the last bar received
+    return min(coverable_end, data.index.max().normalize() + pd.Timedelta(days=1))
+
+@timed()
+def download_price_data(symbol, start_date, end_date, cache_dir=None, source=None):
+    # With a cache_dir, only the bars missing from the cached range are fetched
+    # and fully cached ranges never touch the source.
+    source = source or yahoo_source
+    if cache_dir is None:
+        return source(symbol, start_date, end_date)
+
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize()
+    # Never mark today as covered: its bar may still change
+    coverable_end = min(end, pd.Timestamp.today().normalize())
+
+    cached, covered = _read_cache(cache_dir, symbol)
+    if covered is None:
+        data = source(symbol, start, end)
+        if data.empty:
+            # Don't remember failed or empty downloads
+            return data
+        covered = (start, _received_end(data, coverable_end))
+    else:
+        cached_start, cached_end = covered
+        head = tail = None
+        if start < cached_start:
+            head = source(symbol, start, cached_start)
+        if end > cached_end:
+            # Refetch the last cached bar too, in case it was a partial one
+            refetch_from = cached_end
+            if not cached.empty:
+                refetch_from = min(refetch_from, cached.index.max().normalize())
+            tail = source(symbol, refetch_from, end)
+        if head is None and tail is None:
+            return _slice(cached, start, end)
+
+        parts = [part for part in (head, cached, tail) if part is not None and not part.empty]
+        data = pd.concat(parts or [cached])
+        data = data[~data.index.duplicated(keep="last")].sort_index()
+        # yfinance reports failures as empty frames: only mark as covered what
+        # actually came back, so a failed head or tail is fetched again next time
+        if head is not None and not head.empty:
+            cached_start = start
+        if tail is not None and not tail.empty:
+            cached_end = max(cached_end, _received_end(tail, coverable_end))
+        covered = (cached_start, cached_end)
+
+    _write_cache(cache_dir, symbol, data, covered)
+    return _slice(data, start, end)
+
+
+# --- Universe download ---
+
+def _download_with_retry(symbol, start_date, end_date, cache_dir, source, retries, backoff):
+    # yfinance reports most failures as an empty frame, so retry on those too
+    for attempt in range(retries + 1):
+        try:
+            data = download_price_data(symbol, start_date, end_date, cache_dir=cache_dir, source=source)
+            if not data.empty or attempt == retries:
+                return data
+        except Exception:
+            if attempt == retries:
+                raise
+        time.sleep(backoff * 2 ** attempt)
+
+@timed()
+def download_universe(symbols, start_date, end_date, cache_dir=None, source=None,
+                      max_workers=8, retries=2, backoff=1.0):
+    # Downloads every symbol on a bounded thread pool. Returns ({symbol: frame},
+    # {symbol: error message}): a symbol that still fails or comes back empty
+    # after its retries is logged and reported instead of aborting the rest.
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            symbol: pool.submit(_download_with_retry, symbol, start_date, end_date,
+                                cache_dir, source, retries, backoff)
+            for symbol in symbols
+        }
+        frames, failures = {}, {}
+        for symbol, future in futures.items():
+            try:
+                data = future.result()
+            except Exception as exc:
+                failures[symbol] = f"{type(exc).__name__}: {exc}"
+            else:
+                if data.empty:
+                    failures[symbol] = "no price data"
+                else:
+                    frames[symbol] = data
+            if symbol in failures:
+                log.warning("Download failed for %s: %s", symbol, failures[symbol])
+        return frames, failures
+
+def price_panel(frames, column):
+    # One concat for the whole universe, on the first symbol's calendar like the
+    # old column-by-column assignment
+    symbols = list(frames)
+    panel = pd.concat([frames[symbol][column] for symbol in symbols], axis=1, keys=symbols)
+    return panel.reindex(frames[symbols[0]].index)
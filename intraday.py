@@ -0,0 +1,201 @@
+# intraday.py
+import math
+
+import numpy as np
+import pandas as pd
+
+from indicators import rolling_slope_array
+from signal_engine import ewm_chunk, log_returns, new_indicator_state
+from strategy import (
+    new_position_state, open_position_row, run_kernel, ENTRY_BAR, ENTRY_PRICE, IN_POSITION,
+)
+from trades import TradeLog
+
+
+# --- Reading bars in blocks ---
+
+def read_bar_chunks(path, chunksize=1_000_000, columns=("Open", "Close")):
+    # DataFrames of at most `chunksize` bars indexed by timestamp, read from a
+    # Parquet file (record batches, needs pyarrow) or a CSV file with the
+    # timestamp in its first column
+    columns = list(columns)
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path)
+        metadata = parquet.schema_arrow.pandas_metadata or {}
+        index_columns = [c for c in metadata.get("index_columns", []) if isinstance(c, str)]
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=index_columns + columns):
+            df = batch.to_pandas()
+            if index_columns and index_columns[0] in df.columns:
+                df = df.set_index(index_columns[0])
+            yield df[columns]
+    else:
+        for df in pd.read_csv(path, index_col=0, parse_dates=True, chunksize=chunksize):
+            yield df[columns]
+
+
+class TradeWriter:
+    # Appends each batch of trades to a Parquet (needs pyarrow) or CSV file as
+    # soon as it is produced. Nothing is written until the first trade.
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._writer = None
+
+    def write(self, trades):
+        if not len(trades):
+            return
+        df = trades.to_frame().astype({"symbol": str, "exit_reason": str})
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="a" if self.rows else "w", header=not self.rows, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+# --- Chunked backtest ---
+
+def _append_trades(log, symbol, rows, entry_time, entry_price, exit_time, exit_price,
+                   equity, cumulative):
+    # Same arithmetic as strategy._build_trades, compounding from the equity
+    # and cumulative growth carried over from earlier chunks
+    _, _, reason, stop_pct, highest_pct, trailing_price = rows
+    pct_return = (exit_price - entry_price) / entry_price
+    growth = 1 + pct_return
+    equity_path = np.cumprod(np.concatenate(([equity], growth)))
+    cumulative_path = np.cumprod(np.concatenate(([cumulative], growth)))[1:]
+    shares = equity_path[:-1] / entry_price
+    log.append_columns(
+        symbol,
+        entry_time=entry_time,
+        exit_time=exit_time,
+        entry_price=entry_price,
+        exit_price=exit_price,
+        shares=shares,
+        pnl=shares * (exit_price - entry_price),
+        pct_return=pct_return * 100,
+        cumulative_pct_return=(cumulative_path - 1) * 100,
+        equity=equity_path[1:],
+        exit_reason=reason,
+        stop_loss_pct=stop_pct * 100,  # Save as percent
+        highest_profit_pct=highest_pct,
+        trailing_stop_price=trailing_price,
+    )
+    return equity_path[-1], cumulative_path[-1] if len(growth) else cumulative
+
+
+def stream_backtest(chunks, symbol, halflife, signal_smooth_halflife, slope_window,
+                    volatility_stop_multiplier, initial_capital, require_positive_signal,
+                    enable_trailing_take_profit=True, take_profit_trigger=0.10,
+                    take_profit_fraction=0.50, warmup=None, sink=None):
+    # main.py's signal and strategy over bars arriving as DataFrames with Open
+    # and Close columns. Indicator and open-position state carry across chunk
+    # boundaries and only a few bars are kept between chunks, so memory depends
+    # on the chunk size, not on the history length. Each chunk's closed trades
+    # go to sink(TradeLog). Trades match a whole-history run of
+    # strategy.simulate_strategy (rolling slopes agree to ~1e-9).
+    warmup = max(halflife, signal_smooth_halflife, slope_window) if warmup is None else warmup
+    strategy_args = (require_positive_signal, enable_trailing_take_profit,
+                     take_profit_trigger, take_profit_fraction)
+
+    indicator_state = new_indicator_state()
+    position = new_position_state()
+    last_close = math.nan
+    smoothed_tail = np.empty(0)
+    tail = None        # the last two decision bars of the previous chunk
+    offset = 0         # bar number of tail[0] (or of the chunk, before the first)
+    open_entry = None  # (time, price) of a position opened in an earlier chunk
+    equity, cumulative = float(initial_capital), 1.0
+    bars = trades = 0
+
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        close = chunk["Close"].to_numpy(dtype=np.float64)
+        returns = log_returns(close, last_close)
+        last_close = close[-1]
+        bars += len(close)
+
+        volatility, _, smoothed = ewm_chunk(
+            returns, indicator_state, halflife, signal_smooth_halflife
+        )
+        window_input = np.concatenate((smoothed_tail, smoothed))
+        slope = rolling_slope_array(window_input, slope_window)[len(smoothed_tail):]
+        smoothed_tail = window_input[max(len(window_input) - (slope_window - 1), 0):]
+
+        current = {
+            "slope": slope,
+            "signal": smoothed,
+            "price": chunk["Open"].to_numpy(dtype=np.float64),
+            "stop": volatility_stop_multiplier * volatility,
+            "time": chunk.index.to_numpy(dtype="datetime64[us]"),
+        }
+        if tail is not None:
+            current = {name: np.concatenate((tail[name], values)) for name, values in current.items()}
+        price, times = current["price"], current["time"]
+
+        first = max(1, warmup + 1 - offset)
+        carried = position[IN_POSITION] != 0
+        rows = run_kernel(
+            current["slope"], current["signal"], price, current["stop"], price,
+            np.ones(len(price), dtype=np.bool_), first, position, *strategy_args,
+        )
+        # A carried position's entry bar may lie before this chunk; its fill
+        # comes from open_entry instead
+        entry_fill, exit_fill = np.maximum(rows[0] + 1, 0), rows[1] + 1
+        entry_time, entry_price = times[entry_fill], price[entry_fill]
+        if carried and len(entry_fill):
+            entry_time[0], entry_price[0] = open_entry
+        log = TradeLog(capacity=len(entry_fill))
+        equity, cumulative = _append_trades(
+            log, symbol, rows, entry_time, entry_price, times[exit_fill], price[exit_fill],
+            equity, cumulative,
+        )
+        trades += len(log)
+        if sink is not None and len(log):
+            sink(log)
+
+        if position[IN_POSITION] and (len(entry_fill) or not carried):
+            open_entry = (times[int(position[ENTRY_BAR]) + 1], position[ENTRY_PRICE])
+
+        # Keep the last two bars: the final bar's decision needs the next open
+        advance = max(len(price) - 2, 0)
+        position[ENTRY_BAR] -= advance
+        offset += advance
+        tail = {name: values[advance:] for name, values in current.items()}
+
+    # --- Position still open at the end: forced sell at the last bar ---
+    if position[IN_POSITION]:
+        rows = open_position_row(position)
+        log = TradeLog(capacity=1)
+        equity, cumulative = _append_trades(
+            log, symbol, rows, np.array([open_entry[0]]), np.array([open_entry[1]]),
+            tail["time"][-1:], tail["price"][-1:], equity, cumulative,
+        )
+        trades += 1
+        if sink is not None:
+            sink(log)
+
+    return {"symbol": symbol, "bars": bars, "trades": trades, "final_equity": float(equity)}
+
+
+def backtest_file(path, symbol, output, chunksize=1_000_000, **strategy_kwargs):
+    # Streams bars from a Parquet/CSV file and appends trades to `output`
+    # (.parquet or .csv); see stream_backtest for the strategy arguments
+    writer = TradeWriter(output)
+    try:
+        return stream_backtest(
+            read_bar_chunks(path, chunksize), symbol, sink=writer.write, **strategy_kwargs
+        )
+    finally:
+        writer.close()
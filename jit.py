@@ -0,0 +1,31 @@
+# jit.py
+import importlib.util
+import threading
+
+# numba is optional. Importing it and loading cached kernels costs ~0.45 s,
+# more than the numpy / pandas fallbacks take on a few daily histories, so
+# kernels are only compiled once this many elements (bars x symbols) of work
+# have gone through them in the process.
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+NUMBA_MIN_WORK = 2_000_000
+
+
+class LazyJit:
+    # numba-compiled `func`, loaded on demand: get(work) returns it once the
+    # accumulated work reaches NUMBA_MIN_WORK (or with force=True), else None
+    # and the caller uses its fallback. Once loaded it's used for everything.
+    def __init__(self, func):
+        self.func = func
+        self.work = 0
+        self.compiled = None
+        self._lock = threading.Lock()
+
+    def get(self, work=0, force=False):
+        if self.compiled is not None or not NUMBA_AVAILABLE:
+            return self.compiled
+        with self._lock:
+            self.work += work
+            if self.compiled is None and (force or self.work >= NUMBA_MIN_WORK):
+                from numba import njit
+                self.compiled = njit(cache=True)(self.func)
+        return self.compiled
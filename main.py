@@ -1,83 +1,109 @@
 # main.py
-import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
-import yfinance as yf
 
 from config import (
     asset_config, start_date, end_date, halflife,
     signal_smooth_halflife, slope_window,
     require_positive_signal, volatility_stop_multiplier,
-    take_profit_trigger, take_profit_fraction, enable_trailing_take_profit
+    take_profit_trigger, take_profit_fraction, enable_trailing_take_profit,
+    cache_dir, download_workers, download_retries, strategy_workers,
+    monte_carlo_paths, monte_carlo_block,
+    panel_dtype, panel_dir, panel_block_size, result_store_dir, result_store_max_mb,
+    portfolio_allocation, portfolio_rebalance, portfolio_cost_bps,
+    profile, profile_memory, profile_output
 )
 
-from data import download_price_data
-from indicators import calculate_ew_returns, calculate_ew_volatility, calculate_signal, rolling_slope
-from strategy import run_strategy
+from backtest import backtest_universe
+from data import download_universe
+from montecarlo import distribution_summary, run_bootstrap
+from plotting import plot_strategy
+from portfolio import portfolio_metrics, print_portfolio, simulate_portfolio
+from profiling import PROFILER, cprofile, stage
+from result_store import ResultStore
 from summary import summarize_trades
+from trades import TradeLog
 
-# --- Download both Close and Open ---
-price_data_close = pd.DataFrame()
-price_data_open = pd.DataFrame()
 
-for symbol in asset_config:
-    data = download_price_data(symbol, start_date, end_date)
-    price_data_close[symbol] = data["Close"]
-    price_data_open[symbol] = data["Open"]
-
-# --- Calculations based on CLOSE prices ---
-returns = np.log(price_data_close / price_data_close.shift(1))
-ewma_returns = calculate_ew_returns(returns, halflife)
-ewma_volatility = calculate_ew_volatility(returns, halflife)
-signal = 100 * calculate_signal(returns, ewma_volatility, halflife)
-smoothed_signal = signal.ewm(halflife=signal_smooth_halflife).mean()
-slope_data = pd.DataFrame({s: rolling_slope(smoothed_signal[s], slope_window) for s in asset_config})
+def main():
+    # --- Download both Close and Open ---
+    frames, failures = download_universe(
+        list(asset_config), start_date, end_date, cache_dir=cache_dir,
+        max_workers=download_workers, retries=download_retries,
+    )
+    if not frames:
+        raise SystemExit("No price data for any symbol.")
+    # Symbols whose download failed are left out of the run
+    assets = {symbol: config for symbol, config in asset_config.items() if symbol in frames}
+    store = None
+    if result_store_dir is not None:
+        store = ResultStore(result_store_dir, max_bytes=result_store_max_mb * 2 ** 20)
+    price_data_close, price_data_open, _, results = backtest_universe(
+        frames, assets, halflife, signal_smooth_halflife, slope_window,
+        volatility_stop_multiplier, require_positive_signal,
+        enable_trailing_take_profit=enable_trailing_take_profit,
+        take_profit_trigger=take_profit_trigger,
+        take_profit_fraction=take_profit_fraction,
+        panel_dtype=panel_dtype, panel_dir=panel_dir, panel_block_size=panel_block_size,
+        max_workers=strategy_workers, store=store,
+    )
 
-# --- Volatility-Based Stop-Loss Thresholds ---
-# This gives you a daily % stop-loss value per asset
-stop_loss_series = {
-    symbol: volatility_stop_multiplier * ewma_volatility[symbol] for symbol in asset_config
-}
+    # --- Set up plots ---
+    with stage("main.plot_setup"):
+        fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(14, 12), sharex=True,
+                                            gridspec_kw={'height_ratios': [2, 1.5, 1]})
+    for _, payload in results:
+        plot_strategy(payload, ax1, ax2, ax3)
 
-warmup = max(halflife, signal_smooth_halflife, slope_window)
+    # --- Finalize plots ---
+    for ax in [ax1, ax2, ax3]:
+        ax.legend()
+        ax.grid(True)
 
-# --- Set up plots ---
-fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(14, 12), sharex=True,
-                                    gridspec_kw={'height_ratios': [2, 1.5, 1]})
+    ax2.axhline(0, color='black', linestyle='--', linewidth=1)
+    ax3.axhline(0, color='black', linestyle='--', linewidth=1)
+    ax1.set_title("Cumulative Returns (Close-based)")
+    ax2.set_title("Smoothed Signal (Close-based)")
+    ax3.set_title("Slope of Smoothed Signal")
+    ax3.set_xlabel("Date")
 
-all_trades = []
+    all_trades = TradeLog.concat([trades for trades, _ in results])
+    summary_df, daily_pnl_df = summarize_trades(all_trades, assets)
 
-# --- Run strategy with dynamic stop-loss ---
-for symbol, config in asset_config.items():
-    trades = run_strategy(
-        symbol=symbol,
-        price_series=price_data_open[symbol].iloc[warmup:],   # EXECUTION at OPEN
-        signal_series=smoothed_signal[symbol].iloc[warmup:], # SIGNAL from CLOSE
-        slope_series=slope_data[symbol].iloc[warmup:],
-        stop_loss_series=stop_loss_series[symbol].iloc[warmup:],
-        returns=returns[symbol],
-        initial_capital=config["initial_capital"],
-        require_positive_signal=require_positive_signal,
-        ax1=ax1, ax2=ax2, ax3=ax3,
-        enable_trailing_take_profit=enable_trailing_take_profit,
-        take_profit_trigger=take_profit_trigger,        
-        take_profit_fraction=take_profit_fraction
+    # --- Shared-capital portfolio, marked to market daily ---
+    portfolio_daily, _ = simulate_portfolio(
+        all_trades, price_data_open.to_frame(), price_data_close.to_frame(), assets,
+        allocation=portfolio_allocation, rebalance=portfolio_rebalance,
+        cost_bps=portfolio_cost_bps,
     )
-    all_trades.extend(trades)
+    print_portfolio(portfolio_metrics(portfolio_daily["equity"]))
 
-# --- Finalize plots ---
-for ax in [ax1, ax2, ax3]:
-    ax.legend()
-    ax.grid(True)
+    # --- Block-bootstrap robustness check on the close returns ---
+    for symbol, config in assets.items():
+        if not monte_carlo_paths:
+            break
+        close = price_data_close[symbol]
+        paths = run_bootstrap(
+            np.log(close / close.shift(1)), n_paths=monte_carlo_paths, mean_block=monte_carlo_block,
+            halflife=halflife, signal_smooth_halflife=signal_smooth_halflife,
+            slope_window=slope_window, volatility_stop_multiplier=volatility_stop_multiplier,
+            initial_capital=config["initial_capital"],
+            require_positive_signal=require_positive_signal,
+            enable_trailing_take_profit=enable_trailing_take_profit,
+            take_profit_trigger=take_profit_trigger,
+            take_profit_fraction=take_profit_fraction,
+        )
+        print(f"\n=== Monte Carlo: {symbol} ({monte_carlo_paths} paths) ===")
+        print(distribution_summary(paths).round(2).to_string())
 
+    plt.tight_layout()
+    if profile:
+        PROFILER.print_report()
+    plt.show()
 
-ax2.axhline(0, color='black', linestyle='--', linewidth=1)
-ax3.axhline(0, color='black', linestyle='--', linewidth=1)
-ax1.set_title("Cumulative Returns (Close-based)")
-ax2.set_title("Smoothed Signal (Close-based)")
-ax3.set_title("Slope of Smoothed Signal")
-ax3.set_xlabel("Date")
 
-summary_df, daily_pnl_df = summarize_trades(all_trades, asset_config)
-plt.tight_layout()
-plt.show()
+if __name__ == "__main__":
+    if profile:
+        PROFILER.enable(track_memory=profile_memory)
+    with cprofile(profile_output):
+        main()
@@ -0,0 +1,147 @@
+# montecarlo.py
+import numpy as np
+import pandas as pd
+
+from indicators import rolling_slope_array
+from profiling import timed
+from signal_engine import ewm_signals
+
+
+def stationary_bootstrap_indices(n_source, n_bars, n_paths, mean_block, rng):
+    # Politis-Romano stationary bootstrap: blocks start at uniform positions and
+    # have geometric lengths with mean `mean_block`; blocks wrap around the end.
+    # Returns an (n_paths, n_bars) array of indices into the source returns.
+    new_block = rng.random((n_paths, n_bars)) < 1.0 / mean_block
+    new_block[:, 0] = True
+    starts = rng.integers(0, n_source, size=(n_paths, n_bars))
+
+    t = np.arange(n_bars)
+    block_start = np.maximum.accumulate(np.where(new_block, t, 0), axis=1)
+    first_index = np.take_along_axis(starts, block_start, axis=1)
+    return (first_index + (t - block_start)) % n_source
+
+
+def simulate_paths(close, slope, signal, stop, require_positive_signal=False,
+                   enable_trailing_take_profit=True, take_profit_trigger=0.10,
+                   take_profit_fraction=0.50, initial_capital=10000):
+    # The strategy's buy / stop-loss / trailing-stop / slope-sell rules run for
+    # every path at once: arrays are (bars, paths) and the loop is over bars
+    # only. Decisions on bar i fill at close[i + 1], as in strategy.py.
+    n_bars, n_paths = close.shape
+    in_position = np.zeros(n_paths, dtype=bool)
+    entry_price = np.ones(n_paths)
+    stop_price = np.zeros(n_paths)
+    highest = np.zeros(n_paths)
+    trailing = np.zeros(n_paths)
+    has_trailing = np.zeros(n_paths, dtype=bool)
+    equity = np.full(n_paths, float(initial_capital))
+    peak = equity.copy()
+    max_drawdown = np.zeros(n_paths)
+    trades = np.zeros(n_paths, dtype=np.int64)
+
+    def mark(i):
+        value = np.where(in_position, equity * close[i] / entry_price, equity)
+        np.maximum(peak, value, out=peak)
+        np.maximum(max_drawdown, 1 - value / peak, out=max_drawdown)
+
+    for i in range(1, n_bars - 1):
+        mark(i)
+        prev_slope, curr_slope, price = slope[i - 1], slope[i], close[i]
+
+        # --- BUY ---
+        buy = (prev_slope < 0) & (curr_slope >= 0) & ~in_position
+        if require_positive_signal:
+            buy &= signal[i] > 0
+        if buy.any():
+            entry_price = np.where(buy, close[i + 1], entry_price)
+            stop_price = np.where(buy, entry_price * (1 - stop[i]), stop_price)
+            highest[buy] = 0.0
+            has_trailing &= ~buy
+            in_position |= buy
+
+        # --- SELL ---
+        if not in_position.any():
+            continue
+        if enable_trailing_take_profit:
+            unrealized_pct = (price - entry_price) / entry_price * 100
+            active = in_position & (unrealized_pct >= take_profit_trigger * 100)
+            highest = np.where(active, np.maximum(highest, unrealized_pct), highest)
+            new_trailing = entry_price * (1 + take_profit_fraction * highest / 100)
+            trailing = np.where(
+                active, np.where(has_trailing, np.maximum(trailing, new_trailing), new_trailing), trailing
+            )
+            has_trailing |= active
+
+        sell = in_position & (
+            (price <= stop_price)
+            | (has_trailing & (price <= trailing) if enable_trailing_take_profit else False)
+            | ((prev_slope > 0) & (curr_slope <= 0))
+        )
+        if sell.any():
+            exit_price = close[i + 1]
+            equity = np.where(sell, equity * (1 + (exit_price - entry_price) / entry_price), equity)
+            trades += sell
+            in_position &= ~sell
+
+    # --- Forced sell at the end ---
+    last = close[-1]
+    equity = np.where(in_position, equity * (1 + (last - entry_price) / entry_price), equity)
+    trades += in_position
+    in_position[:] = False
+    mark(n_bars - 1)
+
+    return pd.DataFrame({
+        "final_equity": equity,
+        "return_pct": (equity / initial_capital - 1) * 100,
+        "max_drawdown_pct": max_drawdown * 100,
+        "trades": trades,
+    })
+
+
+@timed()
+def run_bootstrap(returns, n_paths=1000, n_bars=None, mean_block=20, chunk_size=250, seed=0,
+                  halflife=100, signal_smooth_halflife=100, slope_window=50,
+                  volatility_stop_multiplier=8, initial_capital=10000, **strategy_kwargs):
+    # Resamples log `returns` into n_paths synthetic histories and backtests all
+    # of them. Paths are processed chunk_size at a time, so memory is bounded by
+    # the chunk rather than by n_paths. Returns one row of metrics per path.
+    source = np.asarray(pd.Series(returns).dropna(), dtype=np.float64)
+    n_bars = n_bars or len(source)
+    warmup = max(halflife, signal_smooth_halflife, slope_window)
+    seeds = np.random.SeedSequence(seed).spawn((n_paths + chunk_size - 1) // chunk_size)
+
+    results = []
+    for chunk, chunk_seed in enumerate(seeds):
+        size = min(chunk_size, n_paths - chunk * chunk_size)
+        rng = np.random.default_rng(chunk_seed)
+        index = stationary_bootstrap_indices(len(source), n_bars, size, mean_block, rng)
+
+        # (bars, paths); the first bar has no return, like a shifted price series
+        path_returns = source[index].T
+        path_returns[0] = np.nan
+        close = np.exp(np.nan_to_num(path_returns).cumsum(axis=0))
+
+        signals = ewm_signals(path_returns, halflife, signal_smooth_halflife,
+                              outputs=("volatility", "smoothed_signal"))
+        smoothed = signals["smoothed_signal"]
+        slope = rolling_slope_array(smoothed, slope_window)
+        stop = volatility_stop_multiplier * signals["volatility"]
+
+        def rows(values):
+            return np.ascontiguousarray(values[warmup:], dtype=np.float64)
+
+        chunk_result = simulate_paths(
+            rows(close), rows(slope), rows(smoothed), rows(stop),
+            initial_capital=initial_capital, **strategy_kwargs,
+        )
+        chunk_result.index += chunk * chunk_size
+        results.append(chunk_result)
+
+    return pd.concat(results)
+
+
+def distribution_summary(results, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    # Quantiles of every metric across paths, plus mean and std
+    summary = results.quantile(list(quantiles))
+    summary.index = [f"q{int(q * 100):02d}" for q in quantiles]
+    return pd.concat([summary, results.agg(["mean", "std"])])
@@ -0,0 +1,150 @@
+# panel.py
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from profiling import timed
+from signal_engine import compute_signals
+
+
+class Panel:
+    # Dates x symbols array plus a validity mask (False where a symbol has no
+    # bar). Values may be float32 and either in RAM or an np.memmap on disk;
+    # computations go through column blocks so only one block is ever float64.
+    # Arrays are column-major, so a block of symbols is contiguous in memory
+    # and on disk.
+    def __init__(self, values, index, columns, mask=None, path=None):
+        self.values = values
+        self.index = pd.Index(index)
+        self.columns = pd.Index(columns)
+        self.mask = ~np.isnan(values) if mask is None else mask
+        self.path = path
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    # --- Construction ---
+
+    @classmethod
+    def empty(cls, index, columns, dtype=np.float64, path=None):
+        # NaN-filled panel; with `path` the values and mask are memory-mapped
+        # files (<path>.values / <path>.mask) described by <path>.json
+        shape = (len(index), len(columns))
+        if path is None:
+            return cls(np.full(shape, np.nan, dtype=dtype, order="F"), index, columns,
+                       mask=np.zeros(shape, dtype=bool, order="F"))
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        values = np.memmap(path + ".values", dtype=dtype, mode="w+", shape=shape, order="F")
+        values[:] = np.nan
+        mask = np.memmap(path + ".mask", dtype=bool, mode="w+", shape=shape, order="F")
+        meta = {
+            "dtype": np.dtype(dtype).str,
+            "index": [str(ts) for ts in index],
+            "columns": list(columns),
+        }
+        with open(path + ".json", "w") as f:
+            json.dump(meta, f)
+        return cls(values, index, columns, mask=mask, path=path)
+
+    @classmethod
+    def open(cls, path, mode="r"):
+        with open(path + ".json") as f:
+            meta = json.load(f)
+        shape = (len(meta["index"]), len(meta["columns"]))
+        values = np.memmap(path + ".values", dtype=meta["dtype"], mode=mode, shape=shape, order="F")
+        mask = np.memmap(path + ".mask", dtype=bool, mode=mode, shape=shape, order="F")
+        return cls(values, pd.DatetimeIndex(meta["index"]), meta["columns"], mask=mask, path=path)
+
+    @classmethod
+    def from_frame(cls, df, dtype=np.float64, path=None):
+        panel = cls.empty(df.index, df.columns, dtype=dtype, path=path)
+        panel.write_block(0, df)
+        return panel
+
+    @classmethod
+    def from_frames(cls, frames, column, dtype=np.float64, path=None):
+        # Same layout as data.price_panel (first symbol's calendar), filled one
+        # symbol at a time instead of through a full-width concat
+        symbols = list(frames)
+        index = frames[symbols[0]].index
+        panel = cls.empty(index, symbols, dtype=dtype, path=path)
+        for j, symbol in enumerate(symbols):
+            panel.write_block(j, frames[symbol][column].reindex(index).to_frame())
+        return panel
+
+    # --- Access ---
+
+    def block(self, start, stop, rows=slice(None)):
+        # Columns [start, stop) as a float64 DataFrame, NaN where masked; `rows`
+        # (a slice) limits the read to those dates, e.g. slice(-n, None)
+        values = np.array(self.values[rows, start:stop], dtype=np.float64)
+        values[~self.mask[rows, start:stop]] = np.nan
+        return pd.DataFrame(values, index=self.index[rows], columns=self.columns[start:stop])
+
+    def write_block(self, start, df):
+        values = df.to_numpy(dtype=np.float64)
+        stop = start + values.shape[1]
+        self.values[:, start:stop] = values
+        self.mask[:, start:stop] = ~np.isnan(values)
+
+    def column_blocks(self, block_size, rows=slice(None)):
+        for start in range(0, self.shape[1], block_size):
+            stop = min(start + block_size, self.shape[1])
+            yield start, self.block(start, stop, rows)
+
+    def to_frame(self, columns=None):
+        if columns is None:
+            return self.block(0, self.shape[1])
+        return pd.concat([self[symbol] for symbol in columns], axis=1)
+
+    def __getitem__(self, symbol):
+        j = self.columns.get_loc(symbol)
+        return self.block(j, j + 1)[symbol]
+
+    def flush(self):
+        if isinstance(self.values, np.memmap):
+            self.values.flush()
+            self.mask.flush()
+
+    def map_blocks(self, func, block_size=256, dtype=None, path=None):
+        # New panel holding func(block) for each column block; func must return
+        # a frame shaped like its input
+        out = Panel.empty(self.index, self.columns, dtype=dtype or self.dtype, path=path)
+        for start, df in self.column_blocks(block_size):
+            out.write_block(start, func(df))
+        out.flush()
+        return out
+
+
+INDICATOR_NAMES = ["volatility", "signal", "smoothed_signal", "slope"]
+
+
+@timed()
+def compute_indicators(close, halflife, signal_smooth_halflife, slope_window,
+                       block_size=256, dtype=None, directory=None, names=INDICATOR_NAMES):
+    # The signal_engine chain over a close Panel, one column block at a time,
+    # so intermediate arrays only ever exist per block. With `directory` every
+    # output is a memory-mapped panel stored there. Returns {name: Panel} for
+    # the requested names (a subset of INDICATOR_NAMES).
+    dtype = dtype or close.dtype
+    out = {
+        name: Panel.empty(close.index, close.columns, dtype=dtype,
+                          path=directory and os.path.join(directory, name))
+        for name in names
+    }
+    for start, prices in close.column_blocks(block_size):
+        signals = compute_signals(prices, halflife, signal_smooth_halflife, slope_window,
+                                  outputs=names)
+        for name, values in signals.items():
+            out[name].write_block(start, values)
+    for panel in out.values():
+        panel.flush()
+    return out
@@ -0,0 +1,157 @@
+# pipeline.py
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from data import download_price_data
+from indicators import rolling_slope
+from profiling import stage as profile_stage
+from result_store import content_hash
+from signal_engine import ewm_signals, log_returns
+from strategy import simulate_strategy
+
+
+class Stage:
+    # One node of the DAG: func(*dep_values, **params). With hash_output the
+    # result's content hash (not its inputs) keys everything downstream.
+    # Cached results older than ttl seconds are recomputed, and results for
+    # which cache_if(value) is false are returned but not cached.
+    def __init__(self, name, func, deps=(), params=(), maxsize=32, hash_output=False,
+                 ttl=None, cache_if=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.params = tuple(params)
+        self.maxsize = maxsize
+        self.hash_output = hash_output
+        self.ttl = ttl
+        self.cache_if = cache_if
+
+
+class Pipeline:
+    # Stage DAG with a bounded LRU cache per stage. A stage's key hashes its own
+    # parameters and its dependencies' keys, so changing one parameter only
+    # recomputes the stages downstream of it. Safe to share across threads.
+    def __init__(self, stages):
+        self.stages = {stage.name: stage for stage in stages}
+        self._caches = {name: OrderedDict() for name in self.stages}
+        self._lock = threading.Lock()
+        self.computed = {name: 0 for name in self.stages}
+
+    def run(self, target, **params):
+        return self._resolve(target, params, {})[1]
+
+    def _resolve(self, name, params, resolved):
+        if name in resolved:
+            return resolved[name]
+        stage = self.stages[name]
+        deps = [self._resolve(dep, params, resolved) for dep in stage.deps]
+        stage_params = {param: params[param] for param in stage.params}
+        key = content_hash((name, sorted(stage_params.items()), [dep_key for dep_key, _ in deps]))
+
+        cache = self._caches[name]
+        now = time.monotonic()
+        with self._lock:
+            hit = cache.get(key)
+            if hit is not None:
+                if stage.ttl is not None and now - hit[2] > stage.ttl:
+                    del cache[key]
+                    hit = None
+                else:
+                    cache.move_to_end(key)
+        if hit is None:
+            with profile_stage(f"pipeline.{name}"):
+                value = stage.func(*[dep_value for _, dep_value in deps], **stage_params)
+            out_key = content_hash(value) if stage.hash_output else key
+            hit = (out_key, value, now)
+            with self._lock:
+                self.computed[name] += 1
+                if stage.cache_if is None or stage.cache_if(value):
+                    cache[key] = hit
+                    while len(cache) > stage.maxsize:
+                        cache.popitem(last=False)
+
+        resolved[name] = hit[:2]
+        return hit[:2]
+
+
+# --- Strategy stages ---
+
+def _prices(ticker, start_date, end_date, cache_dir):
+    return download_price_data(ticker, start_date, end_date, cache_dir=cache_dir)
+
+def _has_rows(prices):
+    return prices is not None and not prices.empty
+
+def _returns(prices):
+    price_close = prices["Close"].squeeze()
+    return pd.Series(log_returns(price_close.to_numpy()), index=price_close.index)
+
+def _ewm(returns, halflife, signal_smooth_halflife):
+    # Volatility and smoothed signal from one fused pass; the raw signal is
+    # never materialized
+    out = ewm_signals(returns.to_numpy(), halflife, signal_smooth_halflife,
+                      outputs=("volatility", "smoothed_signal"))
+    return {name: pd.Series(values, index=returns.index) for name, values in out.items()}
+
+def _volatility(ewm):
+    return ewm["volatility"]
+
+def _smoothed_signal(ewm):
+    return ewm["smoothed_signal"]
+
+def _slope(smoothed_signal, slope_window):
+    return rolling_slope(smoothed_signal, slope_window)
+
+def _stop_loss(volatility, volatility_stop_multiplier):
+    return volatility_stop_multiplier * volatility
+
+def _backtest(prices, smoothed_signal, slope, stop_loss, ticker, initial_capital,
+              halflife, signal_smooth_halflife, slope_window, require_positive_signal,
+              enable_trailing_take_profit, take_profit_trigger, take_profit_fraction,
+              store=None):
+    warmup = max(halflife, signal_smooth_halflife, slope_window)
+    return simulate_strategy(
+        symbol=ticker,
+        price_series=prices["Open"].squeeze().iloc[warmup:],
+        signal_series=smoothed_signal.iloc[warmup:],
+        slope_series=slope.iloc[warmup:],
+        stop_loss_series=stop_loss.iloc[warmup:],
+        initial_capital=initial_capital,
+        require_positive_signal=require_positive_signal,
+        enable_trailing_take_profit=enable_trailing_take_profit,
+        take_profit_trigger=take_profit_trigger,
+        take_profit_fraction=take_profit_fraction,
+        store=store,
+    )
+
+def build_strategy_pipeline(maxsize=32, store=None, prices_ttl=15 * 60):
+    # run("backtest", **params) -> (trades, payload); see _backtest for params.
+    # With a ResultStore, backtests are also looked up on / written to disk
+    # (see strategy.simulate_strategy), shared with main.py and the CLI.
+    # Prices are re-read after prices_ttl seconds so ranges reaching today pick
+    # up new bars (the price cache makes this cheap for older ranges; unchanged
+    # data hashes the same, so nothing downstream reruns). Empty downloads
+    # aren't cached.
+    return Pipeline([
+        Stage("prices", _prices, params=("ticker", "start_date", "end_date", "cache_dir"),
+              maxsize=maxsize, hash_output=True, ttl=prices_ttl, cache_if=_has_rows),
+        Stage("returns", _returns, deps=("prices",), maxsize=maxsize),
+        Stage("ewm", _ewm, deps=("returns",),
+              params=("halflife", "signal_smooth_halflife"), maxsize=maxsize),
+        Stage("volatility", _volatility, deps=("ewm",), maxsize=maxsize),
+        Stage("smoothed_signal", _smoothed_signal, deps=("ewm",), maxsize=maxsize),
+        Stage("slope", _slope, deps=("smoothed_signal",),
+              params=("slope_window",), maxsize=maxsize),
+        Stage("stop_loss", _stop_loss, deps=("volatility",),
+              params=("volatility_stop_multiplier",), maxsize=maxsize),
+        Stage("backtest", functools.partial(_backtest, store=store),
+              deps=("prices", "smoothed_signal", "slope", "stop_loss"),
+              params=("ticker", "initial_capital", "halflife", "signal_smooth_halflife",
+                      "slope_window", "require_positive_signal", "enable_trailing_take_profit",
+                      "take_profit_trigger", "take_profit_fraction"),
+              maxsize=maxsize),
+    ])
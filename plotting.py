@@ -0,0 +1,121 @@
+# plotting.py
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.collections import LineCollection
+
+from profiling import timed
+from strategy import STOP_LOSS, TRAILING_STOP, FORCED_SELL
+
+EXIT_COLORS = {
+    STOP_LOSS: 'red',
+    TRAILING_STOP: 'purple',
+    FORCED_SELL: 'orange',
+}
+
+
+def minmax_indices(y, n_buckets):
+    # Min-max decimation: positions of the first minimum and maximum of y in
+    # each of n_buckets equal slices, plus both end points. At two buckets per
+    # pixel every spike and drawdown stays visible. An all-NaN slice keeps one
+    # point so the line still breaks there.
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    starts = np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1]
+    bucket = np.repeat(np.arange(n_buckets), np.diff(np.append(starts, n)))
+    low = np.fmin.reduceat(y, starts)
+    high = np.fmax.reduceat(y, starts)
+
+    keep = np.zeros(n, dtype=bool)
+    for extreme in (low, high):
+        hit = np.flatnonzero(y == extreme[bucket])
+        _, first = np.unique(bucket[hit], return_index=True)
+        keep[hit[first]] = True
+    keep[starts[np.isnan(low)]] = True
+    keep[[0, n - 1]] = True
+    return np.flatnonzero(keep)
+
+
+def _visible_range(index, xlim):
+    if xlim is None:
+        return 0, len(index)
+    return index.searchsorted(xlim[0]), index.searchsorted(xlim[1], side="right")
+
+
+def _decimated(series, xlim, n_buckets, extra=()):
+    # Positions of `series` to draw inside xlim, always including `extra`
+    start, stop = _visible_range(series.index, xlim)
+    if n_buckets is None:
+        return np.arange(start, stop)
+    points = start + minmax_indices(series.to_numpy(dtype=np.float64)[start:stop], n_buckets)
+    extra = np.asarray(extra, dtype=np.int64)
+    return np.union1d(points, extra[(extra >= start) & (extra < stop)])
+
+
+@timed()
+def plot_strategy(payload, ax1, ax2, ax3, xlim=None, decimate=True):
+    # Draws one simulate_strategy payload with a handful of batched artists.
+    # xlim=(start, end) restricts drawing to that date range; with decimate the
+    # lines are min-max decimated to about two points per pixel of axis width,
+    # so drawing cost depends on the figure size, not the history length.
+    symbol = payload['symbol']
+    price_series = payload['price_series']
+    signal_series = payload['signal_series']
+    slope_series = payload['slope_series']
+    dates = price_series.index
+    n_buckets = max(int(ax1.bbox.width), 1) if decimate else None
+
+    entry_pos = payload['entry_pos']
+    exit_pos = payload['exit_pos']
+    exit_reason = payload['exit_reason']
+
+    # Trades overlapping the visible range, clipped to it
+    start, stop = _visible_range(dates, xlim)
+    shown = (exit_pos >= start) & (entry_pos < stop)
+    entry_pos, exit_pos, exit_reason = entry_pos[shown], exit_pos[shown], exit_reason[shown]
+    entry_slope, exit_slope, pnl = (
+        payload['entry_slope'][shown], payload['exit_slope'][shown], payload['pnl'][shown]
+    )
+    entry_in = (entry_pos >= start) & (entry_pos < stop)
+    exit_in = (exit_pos >= start) & (exit_pos < stop)
+    sold = (exit_reason != FORCED_SELL) & exit_in
+
+    # --- Trade markers ---
+    if len(entry_pos):
+        line_dates = np.concatenate([dates[entry_pos[entry_in]], dates[exit_pos[exit_in]]])
+        line_colors = ['green'] * int(entry_in.sum()) + [
+            EXIT_COLORS.get(int(reason), 'black') for reason in exit_reason[exit_in]
+        ]
+        ax1.vlines(line_dates, 0, 1, transform=ax1.get_xaxis_transform(),
+                   colors=line_colors, linestyles=':', alpha=0.5)
+        ax3.plot(dates[entry_pos[entry_in]], entry_slope[entry_in], 'go', markersize=8,
+                 label=f"{symbol} Buy")
+    if sold.any():
+        ax3.plot(dates[exit_pos[sold]], exit_slope[sold], 'ro', markersize=8,
+                 label=f"{symbol} Sell")
+
+    # --- Plot ---
+    price_points = _decimated(price_series, xlim, n_buckets,
+                              extra=np.concatenate([entry_pos, exit_pos]))
+    signal_points = _decimated(signal_series, xlim, n_buckets)
+    slope_points = _decimated(slope_series, xlim, n_buckets)
+    ax1.plot(dates[price_points], price_series.iloc[price_points], label=f"{symbol} Price Series")
+    ax2.plot(signal_series.index[signal_points], signal_series.iloc[signal_points],
+             label=f"{symbol} Smoothed Signal")
+    ax3.plot(slope_series.index[slope_points], slope_series.iloc[slope_points],
+             label=f"{symbol} Slope")
+
+    # --- Highlight trades on cumulative return ---
+    if len(entry_pos):
+        x = mdates.date2num(dates[price_points])
+        y = price_series.to_numpy(dtype=np.float64)[price_points]
+        first = price_points.searchsorted(np.maximum(entry_pos, start))
+        last = price_points.searchsorted(np.minimum(exit_pos, stop - 1), side="right")
+        segments = [np.column_stack((x[a:b], y[a:b])) for a, b in zip(first, last)]
+        colors = np.where(pnl >= 0, '#66FF00', 'red')
+        ax1.add_collection(LineCollection(segments, colors=colors, linewidths=2))
+
+    if xlim is not None:
+        ax1.set_xlim(dates[min(start, len(dates) - 1)], dates[max(stop - 1, 0)])
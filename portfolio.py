@@ -0,0 +1,117 @@
+# portfolio.py
+import numpy as np
+import pandas as pd
+
+from profiling import timed
+
+ALLOCATIONS = ("capital", "equal")
+
+
+def position_mask(trades, index, symbols):
+    # Bool (dates, symbols) frame: True from each trade's entry day up to, but
+    # not including, its exit day (both fill at the open)
+    held = np.zeros((len(index) + 1, len(symbols)), dtype=np.int64)
+    if len(trades):
+        columns = pd.Index(symbols).get_indexer(
+            pd.Index(trades.symbols)[trades["symbol"]]
+        )
+        keep = columns >= 0
+        entry = index.searchsorted(trades["entry_time"][keep])
+        exit_ = index.searchsorted(trades["exit_time"][keep])
+        np.add.at(held, (entry, columns[keep]), 1)
+        np.add.at(held, (exit_, columns[keep]), -1)
+    return pd.DataFrame(np.cumsum(held, axis=0)[:-1] > 0, index=index, columns=symbols)
+
+
+def target_weights(held, asset_config, allocation="capital"):
+    # "capital": every symbol owns a fixed slice of the portfolio, proportional
+    # to its initial_capital, and holds cash while out of the market.
+    # "equal": the whole portfolio is split equally across open positions.
+    held = held.to_numpy(dtype=np.float64)
+    if allocation == "capital":
+        capital = np.array([asset_config[s]["initial_capital"] for s in asset_config], dtype=np.float64)
+        return held * (capital / capital.sum())
+    if allocation == "equal":
+        count = held.sum(axis=1, keepdims=True)
+        return np.divide(held, count, out=np.zeros_like(held), where=count > 0)
+    raise ValueError(f"Unknown allocation {allocation!r}, expected one of {ALLOCATIONS}")
+
+
+def rebalance_positions(index, weights, rebalance=None):
+    # Bars where holdings are reset to their target weights: the first bar,
+    # every bar whose targets changed, and with `rebalance` (a pandas period
+    # alias such as "W", "M" or "Q") the first bar of every period
+    changed = np.ones(len(index), dtype=bool)
+    changed[1:] = (weights[1:] != weights[:-1]).any(axis=1)
+    if rebalance is not None:
+        periods = index.to_period(rebalance)
+        changed[1:] |= periods[1:] != periods[:-1]
+    return np.flatnonzero(changed)
+
+
+@timed()
+def simulate_portfolio(trades, price_open, price_close, asset_config, allocation="capital",
+                       rebalance=None, cost_bps=0.0):
+    # Shared-capital portfolio over the symbols in asset_config, driven by the
+    # entry/exit dates in `trades`. Holdings only change on rebalance bars, at
+    # the open; the loop runs over those bars (vectorized across symbols) and
+    # the daily mark-to-market at the close is filled in with array operations.
+    # Returns (daily frame: equity / cash / invested / return, shares frame).
+    symbols = list(asset_config)
+    index = price_close.index
+    open_ = price_open.reindex(index=index, columns=symbols).ffill().to_numpy(dtype=np.float64)
+    close = price_close.reindex(columns=symbols).ffill().to_numpy(dtype=np.float64)
+
+    weights = target_weights(position_mask(trades, index, symbols), asset_config, allocation)
+    bars = rebalance_positions(index, weights, rebalance)
+
+    shares = np.zeros(len(symbols))
+    cash = float(sum(config["initial_capital"] for config in asset_config.values()))
+    shares_at = np.empty((len(bars), len(symbols)))
+    cash_at = np.empty(len(bars))
+    for k, bar in enumerate(bars):
+        price = open_[bar]
+        tradable = price > 0
+        value = cash + np.dot(shares[tradable], price[tradable])
+        target = shares.copy()
+        target[tradable] = weights[bar, tradable] * value / price[tradable]
+        turnover = np.dot(np.abs(target - shares)[tradable], price[tradable])
+        cash = value - np.dot(target[tradable], price[tradable]) - turnover * cost_bps / 10000
+        shares = target
+        shares_at[k] = shares
+        cash_at[k] = cash
+
+    # --- Daily mark-to-market ---
+    segment = np.searchsorted(bars, np.arange(len(index)), side="right") - 1
+    daily_shares = shares_at[segment]
+    invested = np.nansum(daily_shares * close, axis=1)
+    daily = pd.DataFrame({"cash": cash_at[segment], "invested": invested}, index=index)
+    daily["equity"] = daily["cash"] + daily["invested"]
+    daily["return"] = daily["equity"].pct_change().fillna(0.0)
+    return daily, pd.DataFrame(daily_shares, index=index, columns=symbols)
+
+
+def portfolio_metrics(equity, periods_per_year=252):
+    returns = equity.pct_change().dropna()
+    drawdown = equity / equity.cummax() - 1
+    years = len(returns) / periods_per_year
+    volatility = returns.std() * np.sqrt(periods_per_year)
+    total = equity.iloc[-1] / equity.iloc[0]
+    return {
+        "start_value": equity.iloc[0],
+        "final_value": equity.iloc[-1],
+        "return_pct": (total - 1) * 100,
+        "cagr_pct": (total ** (1 / years) - 1) * 100 if years > 0 else np.nan,
+        "volatility_pct": volatility * 100,
+        "sharpe": returns.mean() * periods_per_year / volatility if volatility > 0 else np.nan,
+        "max_drawdown_pct": drawdown.min() * 100,
+    }
+
+
+def print_portfolio(metrics):
+    print("\n=== SHARED-CAPITAL PORTFOLIO ===")
+    print(f"Starting Value: ${metrics['start_value']:.2f}")
+    print(f"Final Value:   ${metrics['final_value']:.2f}")
+    print(f"Return:        {metrics['return_pct']:.2f}% | CAGR: {metrics['cagr_pct']:.2f}%")
+    print(f"Volatility:    {metrics['volatility_pct']:.2f}% | Sharpe: {metrics['sharpe']:.2f}")
+    print(f"Max Drawdown:  {metrics['max_drawdown_pct']:.2f}%")
@@ -0,0 +1,126 @@
+# profiling.py
+import cProfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+import pandas as pd
+
+_DISABLED = nullcontext()
+
+
+class Profiler:
+    # Named stage timers with call counts and, optionally, tracemalloc peak
+    # memory. Disabled by default: a disabled stage() returns a shared null
+    # context and a disabled timed() wrapper costs one attribute check.
+    def __init__(self):
+        self.enabled = False
+        self.track_memory = False
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def enable(self, track_memory=False):
+        self.enabled = True
+        self.track_memory = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.track_memory = False
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def stage(self, name):
+        if not self.enabled:
+            return _DISABLED
+        return _Stage(self, name)
+
+    def timed(self, name=None):
+        # Decorator form of stage(); the name defaults to module.function
+        def decorate(func):
+            label = name or f"{func.__module__}.{func.__qualname__}"
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Stage(self, label):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def _record(self, name, seconds, peak_bytes):
+        with self._lock:
+            stats = self._stats.setdefault(name, [0, 0.0, 0.0, 0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+            stats[3] = max(stats[3], peak_bytes)
+
+    def report(self):
+        # One row per stage, slowest first
+        with self._lock:
+            rows = [
+                {"stage": name, "calls": calls, "total_s": total, "mean_s": total / calls,
+                 "max_s": longest, "peak_mb": peak / 2 ** 20 if self.track_memory else None}
+                for name, (calls, total, longest, peak) in self._stats.items()
+            ]
+        columns = ["stage", "calls", "total_s", "mean_s", "max_s", "peak_mb"]
+        report = pd.DataFrame(rows, columns=columns).set_index("stage")
+        return report.sort_values("total_s", ascending=False)
+
+    def print_report(self):
+        report = self.report()
+        print("\n=== PERFORMANCE ===")
+        if report.empty:
+            print("No stages recorded.")
+            return
+        print(report.to_string(float_format=lambda x: f"{x:.4f}"))
+
+
+class _Stage:
+    # Peak memory is the tracemalloc peak since the stage started; a nested
+    # stage resets that peak for its parent too
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        if self.profiler.track_memory:
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        peak = tracemalloc.get_traced_memory()[1] if self.profiler.track_memory else 0
+        self.profiler._record(self.name, seconds, peak)
+        return False
+
+
+PROFILER = Profiler()
+stage = PROFILER.stage
+timed = PROFILER.timed
+
+
+@contextmanager
+def cprofile(path):
+    # Opt-in deep dive: profiles the block with cProfile and writes the stats
+    # to `path` (open with pstats or snakeviz); path=None profiles nothing
+    if path is None:
+        yield None
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
@@ -0,0 +1,160 @@
+# result_store.py
+import hashlib
+import json
+import os
+import threading
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from trades import TRADE_COLUMNS, TradeLog
+
+# Bump when stored results would change for the same inputs (e.g. a strategy
+# fix): older entries then simply stop matching and age out
+STORE_VERSION = 1
+
+# Eviction trims the store to this fraction of max_bytes, so a full store
+# isn't rescanned on every write
+EVICT_TO = 0.9
+# Rescan anyway after this many writes, to pick up other processes' writes
+RESCAN_EVERY = 1000
+
+# {store directory: [estimated bytes, writes since the last scan]}, per process
+# so pool workers keep it across tasks
+_sizes = {}
+_sizes_lock = threading.Lock()
+
+
+def content_hash(value):
+    h = hashlib.sha1()
+    _hash_into(h, value)
+    return h.hexdigest()
+
+def _hash_into(h, value):
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        if isinstance(value, pd.DataFrame):
+            h.update(repr(list(value.columns)).encode())
+    elif isinstance(value, np.ndarray):
+        h.update(repr((value.dtype.str, value.shape)).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (tuple, list)):
+        h.update(b"(")
+        for item in value:
+            _hash_into(h, item)
+            h.update(b",")
+        h.update(b")")
+    else:
+        h.update(repr(value).encode())
+
+
+class ResultStore:
+    # Content-addressed results on disk: <directory>/v<version>/<key[:2]>/<key>.npz,
+    # one compressed npz of named arrays plus a JSON metadata entry per key.
+    # Writes go through a temp file and a rename, so any number of processes
+    # can share a directory. Once the files exceed max_bytes the least recently
+    # used ones (by mtime, refreshed on every hit) are deleted. The size is
+    # tracked in memory between scans, so a write doesn't stat the whole store.
+    def __init__(self, directory, max_bytes=512 * 2 ** 20, version=STORE_VERSION):
+        self.directory = os.path.join(directory, f"v{version}")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".npz")
+
+    def get(self, key):
+        # (arrays dict, metadata dict), or None on a miss
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                arrays = {name: stored[name] for name in stored.files if name != "__meta__"}
+                meta = json.loads(stored["__meta__"].tobytes())
+            os.utime(path)
+        except (FileNotFoundError, zipfile.BadZipFile, KeyError, ValueError):
+            # Missing, evicted by another process mid-read, or corrupt
+            self.misses += 1
+            return None
+        self.hits += 1
+        return arrays, meta
+
+    def put(self, key, arrays, meta):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(
+                f, __meta__=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8), **arrays
+            )
+        os.replace(tmp, path)
+        self._account(os.path.getsize(path))
+
+    def _account(self, size):
+        with _sizes_lock:
+            tracked = _sizes.get(self.directory)
+            if tracked is not None:
+                tracked[0] += size
+                tracked[1] += 1
+                if tracked[0] <= self.max_bytes and tracked[1] < RESCAN_EVERY:
+                    return
+        self.evict()
+
+    def entries(self):
+        # [(mtime, size, path)] for every stored result
+        out = []
+        if not os.path.isdir(self.directory):
+            return out
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".npz"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    out.append((stat.st_mtime, stat.st_size, entry.path))
+        return out
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+        with _sizes_lock:
+            _sizes[self.directory] = [total, 0]
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        with _sizes_lock:
+            _sizes.pop(self.directory, None)
+
+
+# --- TradeLog <-> arrays ---
+
+def pack_trades(trades, prefix="trade."):
+    # Column arrays plus the symbol list (for the metadata)
+    arrays = {prefix + name: trades[name] for name in TRADE_COLUMNS}
+    return arrays, list(trades.symbols)
+
+def unpack_trades(arrays, symbols, prefix="trade."):
+    columns = {name: arrays[prefix + name] for name in TRADE_COLUMNS}
+    trades = TradeLog(capacity=len(columns["pnl"]))
+    codes = columns.pop("symbol")
+    for code, symbol in enumerate(symbols):
+        rows = codes == code
+        trades.append_columns(symbol, **{name: values[rows] for name, values in columns.items()})
+    return trades
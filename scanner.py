@@ -0,0 +1,116 @@
+# scanner.py
+import heapq
+import math
+
+import numpy as np
+import pandas as pd
+
+from indicators import rolling_slope_array
+from panel import Panel
+from profiling import timed
+from signal_engine import compute_signals
+
+RANK_FIELDS = ("smoothed_signal", "slope")
+
+
+def scan_lookback(halflife, signal_smooth_halflife, slope_window, tolerance=1e-6):
+    # Bars of history the scan needs: EWM weights halve every halflife, so
+    # after log2(1 / tolerance) halflives the dropped history carries less than
+    # `tolerance` of the weight. The signal and its smoothing are chained, so
+    # their burn-ins add. Plus one slope window and the bar before it.
+    # `tolerance` bounds the dropped weight, not the error: with the default
+    # (4038 bars for halflives of 100) smoothed signals and slopes land within
+    # ~1e-9 * max|smoothed signal| of a full-history run.
+    burn_in = math.ceil((halflife + signal_smooth_halflife) * math.log2(1 / tolerance))
+    return burn_in + slope_window + 1
+
+
+def _tail_indicators(prices, halflife, signal_smooth_halflife, slope_window):
+    # The signal chain over a block of trailing bars; only the last smoothed
+    # signal and the last two slopes per column are kept
+    smoothed = compute_signals(prices.to_numpy(), halflife, signal_smooth_halflife, slope_window,
+                               outputs=("smoothed_signal",))["smoothed_signal"]
+    slope = np.full((2, smoothed.shape[1]), np.nan)
+    if len(smoothed) > slope_window:
+        slope = rolling_slope_array(smoothed[-(slope_window + 1):], slope_window)[-2:]
+    return smoothed[-1], slope[0], slope[1]
+
+
+def _push_top(heap, top_k, values, symbols):
+    # Keeps the top_k (value, symbol) pairs seen so far in a min-heap; only
+    # values above the current k-th best are looked at
+    if top_k <= 0:
+        return
+    threshold = heap[0][0] if len(heap) == top_k else -np.inf
+    for j in np.flatnonzero(values > threshold):
+        item = (float(values[j]), symbols[j])
+        if len(heap) < top_k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+
+@timed()
+def scan_universe(close, halflife, signal_smooth_halflife, slope_window, top_k=20,
+                  rank_by="smoothed_signal", lookback=None, block_size=512):
+    # Current slope-crossing state for every symbol in `close` (a Panel or a
+    # dates x symbols frame) without running any backtest. Only the last
+    # `lookback` bars are read (scan_lookback by default), in column blocks.
+    # Returns {"date", "state": one row per symbol, "crossings": symbols whose
+    # slope crossed zero on the last bar, "top": the top_k by rank_by}.
+    if rank_by not in RANK_FIELDS:
+        raise ValueError(f"Unknown rank_by {rank_by!r}, expected one of {RANK_FIELDS}")
+    lookback = lookback or scan_lookback(halflife, signal_smooth_halflife, slope_window)
+    rows = slice(-lookback, None)
+    if not isinstance(close, Panel):
+        close = Panel.from_frame(close.iloc[rows])
+
+    parts = []
+    heap = []
+    for start, prices in close.column_blocks(block_size, rows):
+        smoothed, prev_slope, slope = _tail_indicators(
+            prices, halflife, signal_smooth_halflife, slope_window
+        )
+        present = prices.notna().to_numpy()
+        last_row = len(prices) - 1 - np.argmax(present[::-1], axis=0)
+        parts.append(pd.DataFrame({
+            "last_date": prices.index[last_row].where(present.any(axis=0)),
+            "close": prices.iloc[-1].to_numpy(),
+            "smoothed_signal": smoothed,
+            "prev_slope": prev_slope,
+            "slope": slope,
+        }, index=prices.columns))
+        _push_top(heap, top_k, smoothed if rank_by == "smoothed_signal" else slope,
+                  prices.columns)
+
+    state = pd.concat(parts) if parts else pd.DataFrame(
+        columns=["last_date", "close", "smoothed_signal", "prev_slope", "slope"]
+    )
+    state.index.name = "symbol"
+    buy = (state["prev_slope"] < 0) & (state["slope"] >= 0)
+    sell = (state["prev_slope"] > 0) & (state["slope"] <= 0)
+    state["crossing"] = np.select([buy, sell], ["buy", "sell"], default="")
+
+    top = state.loc[[symbol for _, symbol in sorted(heap, reverse=True)]]
+    top.insert(0, "rank", np.arange(1, len(top) + 1))
+    return {
+        "date": close.index[-1] if len(close.index) else None,
+        "state": state,
+        "crossings": state[state["crossing"] != ""],
+        "top": top,
+    }
+
+
+def print_scan(result, rank_by="smoothed_signal"):
+    date = result["date"]
+    print(f"\n=== SCAN {date.date() if date is not None else ''} "
+          f"({len(result['state'])} symbols) ===")
+    crossings = result["crossings"]
+    print(f"\nSlope crossings: {len(crossings)}")
+    for symbol, row in crossings.iterrows():
+        print(f"{row['crossing'].upper():<4} {symbol:<12} slope {row['prev_slope']:+.5f} → "
+              f"{row['slope']:+.5f} | signal {row['smoothed_signal']:.3f}")
+    print(f"\nTop {len(result['top'])} by {rank_by}:")
+    for symbol, row in result["top"].iterrows():
+        print(f"{row['rank']:>3}. {symbol:<12} signal {row['smoothed_signal']:.3f} | "
+              f"slope {row['slope']:+.5f} {row['crossing']}")
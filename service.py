@@ -0,0 +1,356 @@
+# service.py
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pandas as pd
+
+from streaming import SignalState
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def _finite(x):
+    # JSON has no NaN / inf
+    x = float(x)
+    return x if math.isfinite(x) else None
+
+
+# --- Per-symbol state ---
+
+class TickerState:
+    # Warm state for one symbol: the signal chain committed up to the
+    # second-to-last bar seen, and the newest bar (which may still be forming)
+    # applied to a copy. A refresh re-fetches from the day after the last
+    # committed bar, so a revised latest bar replaces the provisional one.
+    def __init__(self, symbol, halflife, signal_smooth_halflife, slope_window, keep_bars=250):
+        self.symbol = symbol
+        self.committed = SignalState(halflife, signal_smooth_halflife, slope_window)
+        self.committed_date = None
+        self.last_crossing = None
+        self.bars = deque(maxlen=keep_bars)
+        self.latest = None
+        self.refreshed_at = None
+        self.requested_at = time.monotonic()
+
+    def next_start(self, start_date):
+        if self.committed_date is None:
+            return pd.Timestamp(start_date)
+        return self.committed_date + pd.Timedelta(days=1)
+
+    def apply(self, closes):
+        # closes: Close series from the source; returns False when nothing new
+        if self.committed_date is not None:
+            closes = closes[closes.index > self.committed_date]
+        if closes.empty:
+            return False
+        dates = closes.index
+        values = closes.to_numpy(dtype="float64")
+        for date, close in zip(dates[:-1], values[:-1]):
+            row = self._row(date, close, self.committed.update(float(close)))
+            self.bars.append(row)
+            if row["crossing"] is not None:
+                self.last_crossing = {"type": row["crossing"], "date": row["date"]}
+        if len(dates) > 1:
+            self.committed_date = dates[-2]
+
+        provisional = SignalState.from_dict(self.committed.to_dict())
+        self.latest = self._row(dates[-1], values[-1], provisional.update(float(values[-1])))
+        return True
+
+    @staticmethod
+    def _row(date, close, update):
+        return {
+            "date": date.isoformat(),
+            "close": _finite(close),
+            "volatility": _finite(update["volatility"]),
+            "signal": _finite(update["signal"]),
+            "smoothed_signal": _finite(update["smoothed_signal"]),
+            "slope": _finite(update["slope"]),
+            "prev_slope": _finite(update["prev_slope"]),
+            "crossing": update["crossing"],
+        }
+
+    def snapshot(self, bars=0):
+        latest = self.latest
+        last_crossing = self.last_crossing
+        if latest["crossing"] is not None:
+            last_crossing = {"type": latest["crossing"], "date": latest["date"]}
+        slope = latest["slope"]
+        out = {
+            "symbol": self.symbol,
+            **latest,
+            "trend": None if slope is None else ("up" if slope >= 0 else "down"),
+            "last_crossing": last_crossing,
+            "bars_seen": self.committed.bars + 1,
+            "refreshed_at": self.refreshed_at,
+        }
+        if bars:
+            out["history"] = (list(self.bars) + [latest])[-bars:]
+        return out
+
+
+# --- Service ---
+
+class SignalService:
+    # Keeps a TickerState per symbol warm in memory. `source` is any
+    # data.py-style price source, (symbol, start_date, end_date) -> frame with
+    # a Close column, e.g. yahoo_source, file_source(dir) or synthetic_source().
+    # Blocking source calls run on a thread pool; concurrent requests for the
+    # same symbol share one in-flight load or refresh.
+    def __init__(self, source, halflife, signal_smooth_halflife, slope_window,
+                 start_date="2000-01-01", refresh_interval=60.0, idle_timeout=None,
+                 keep_bars=250, max_workers=8):
+        self.source = source
+        self.params = (halflife, signal_smooth_halflife, slope_window)
+        self.start_date = start_date
+        self.refresh_interval = refresh_interval
+        self.idle_timeout = idle_timeout
+        self.keep_bars = keep_bars
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.tickers = {}
+        self.pending = {}
+        self.stats = {"requests": 0, "loads": 0, "refreshes": 0, "coalesced": 0, "errors": 0}
+
+    async def _update(self, symbol):
+        loop = asyncio.get_running_loop()
+        ticker = self.tickers.get(symbol)
+        new = ticker is None
+        if new:
+            ticker = TickerState(symbol, *self.params, keep_bars=self.keep_bars)
+        # Source ranges are half-open, so ask for everything up to tomorrow
+        end = pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+        data = await loop.run_in_executor(
+            self.executor, self.source, symbol, ticker.next_start(self.start_date), end
+        )
+        closes = data["Close"].dropna() if "Close" in data else pd.Series(dtype="float64")
+        if new:
+            if closes.empty:
+                raise LookupError(f"No price data for {symbol}")
+            # Warming up walks the whole history: do it off the event loop,
+            # before the ticker becomes visible to readers
+            await loop.run_in_executor(self.executor, ticker.apply, closes)
+            self.tickers[symbol] = ticker
+            self.stats["loads"] += 1
+        else:
+            # A handful of new bars: cheap enough to apply in place
+            ticker.apply(closes)
+            self.stats["refreshes"] += 1
+        ticker.refreshed_at = time.time()
+        return ticker
+
+    def _schedule(self, symbol):
+        task = self.pending.get(symbol)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return task
+        task = asyncio.ensure_future(self._update(symbol))
+        self.pending[symbol] = task
+        task.add_done_callback(lambda _: self.pending.pop(symbol, None))
+        return task
+
+    async def get(self, symbols, refresh=False, bars=0):
+        # Warm symbols are answered from memory; cold ones (or all of them
+        # with refresh=True) wait for their shared load first
+        symbols = list(dict.fromkeys(symbols))
+        self.stats["requests"] += 1
+        now = time.monotonic()
+        waiting = {
+            symbol: self._schedule(symbol)
+            for symbol in symbols if refresh or symbol not in self.tickers
+        }
+        if waiting:
+            await asyncio.gather(*waiting.values(), return_exceptions=True)
+
+        out = {}
+        for symbol in symbols:
+            task = waiting.get(symbol)
+            error = task.exception() if task is not None and not task.cancelled() else None
+            ticker = self.tickers.get(symbol)
+            if ticker is None:
+                self.stats["errors"] += 1
+                out[symbol] = {"symbol": symbol, "error": str(error or "not loaded")}
+                continue
+            ticker.requested_at = now
+            out[symbol] = ticker.snapshot(bars)
+            if error is not None:
+                # Stale but still useful: keep serving the last good state
+                out[symbol]["error"] = str(error)
+        return out
+
+    async def refresh_all(self):
+        if self.idle_timeout is not None:
+            cutoff = time.monotonic() - self.idle_timeout
+            for symbol in [s for s, t in self.tickers.items() if t.requested_at < cutoff]:
+                del self.tickers[symbol]
+        tasks = [self._schedule(symbol) for symbol in list(self.tickers)]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh_all()
+
+    # --- HTTP ---
+
+    async def route(self, method, target, body):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        path = url.path.rstrip("/")
+
+        if path == "/health":
+            return 200, {"status": "ok", "tickers": len(self.tickers),
+                         "pending": len(self.pending), **self.stats}
+        if path == "/signals" or path.startswith("/signals/"):
+            if method == "POST":
+                request = json.loads(body or b"{}")
+                if not isinstance(request, dict):
+                    raise ValueError("request body must be a JSON object")
+                symbols = request.get("symbols", [])
+                if not isinstance(symbols, list) or not all(isinstance(s, str) for s in symbols):
+                    raise ValueError("symbols must be a list of strings")
+                refresh = bool(request.get("refresh", False))
+                bars = request.get("bars", 0)
+                if not isinstance(bars, int) or isinstance(bars, bool) or bars < 0:
+                    raise ValueError("bars must be a non-negative integer")
+            elif method == "GET":
+                symbols = [s for value in query.get("symbols", []) for s in value.split(",")]
+                refresh = query.get("refresh", ["0"])[-1] not in ("0", "false", "")
+                bars = query.get("bars", ["0"])[-1]
+                if not (bars.isascii() and bars.isdigit()):
+                    raise ValueError("bars must be a non-negative integer")
+                bars = int(bars)
+            else:
+                return 405, {"error": f"{method} not allowed"}
+            if path != "/signals":
+                symbols = [unquote(path[len("/signals/"):])]
+            symbols = [s.strip() for s in symbols if s.strip()]
+            if not symbols:
+                return 400, {"error": "no symbols requested"}
+            started = time.perf_counter()
+            signals = await self.get(symbols, refresh=refresh, bars=bars)
+            return 200, {"signals": signals,
+                         "elapsed_ms": (time.perf_counter() - started) * 1000}
+        return 404, {"error": f"unknown path {url.path}"}
+
+    async def handle(self, reader, writer):
+        # Minimal HTTP/1.1 with keep-alive: one request at a time per connection
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode("latin-1").split()
+                version = parts[2] if len(parts) == 3 else "HTTP/1.0"
+                keep_alive = (version == "HTTP/1.1"
+                              and headers.get("connection", "").lower() != "close")
+                length = headers.get("content-length") or "0"
+                try:
+                    if not (length.isascii() and length.isdigit()):
+                        # The body's extent is unknown: answer, then drop the connection
+                        keep_alive = False
+                        raise ValueError(f"bad Content-Length {length!r}")
+                    body = await reader.readexactly(int(length))
+                    if len(parts) != 3:
+                        raise ValueError("malformed request line")
+                    status, payload = await self.route(parts[0].upper(), parts[1], body)
+                except ValueError as exc:  # includes bad JSON bodies
+                    status, payload = 400, {"error": str(exc)}
+
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"{version} {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8080, preload=()):
+        # Binds the server, warms `preload` and starts the background refresh;
+        # returns the asyncio server (call close() on both when done)
+        server = await asyncio.start_server(self.handle, host, port)
+        if preload:
+            await self.get(preload)
+        self._refresher = asyncio.ensure_future(self.refresh_loop())
+        return server
+
+    def close(self):
+        refresher = getattr(self, "_refresher", None)
+        if refresher is not None:
+            refresher.cancel()
+        for task in list(self.pending.values()):
+            task.cancel()
+        self.executor.shutdown(wait=False)
+
+
+async def serve(service, host, port, preload=()):
+    server = await service.start(host, port, preload)
+    print(f"Serving signals for {len(service.tickers)} symbol(s) on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    import config
+    from data import file_source, yahoo_source
+
+    parser = argparse.ArgumentParser(description="Serve current signal / slope / crossing state")
+    parser.add_argument("symbols", nargs="*", help="symbols to warm up at start (default: asset_config)")
+    parser.add_argument("--host", default=config.service_host)
+    parser.add_argument("--port", type=int, default=config.service_port)
+    parser.add_argument("--refresh", type=float, default=config.service_refresh_seconds,
+                        help="seconds between background refreshes")
+    parser.add_argument("--idle-timeout", type=float, default=None,
+                        help="drop symbols not requested for this many seconds")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--source-dir", help="read <symbol>.parquet/.csv files instead of downloading")
+    source.add_argument("--synthetic", action="store_true", help="use synthetic prices (offline)")
+    args = parser.parse_args(argv)
+
+    if args.source_dir:
+        price_source = file_source(args.source_dir)
+    elif args.synthetic:
+        from synthetic import synthetic_source
+        price_source = synthetic_source()
+    else:
+        price_source = yahoo_source
+
+    service = SignalService(
+        price_source, config.halflife, config.signal_smooth_halflife, config.slope_window,
+        start_date=config.start_date, refresh_interval=args.refresh,
+        idle_timeout=args.idle_timeout,
+    )
+    preload = args.symbols or list(config.asset_config)
+    try:
+        asyncio.run(serve(service, args.host, args.port, preload))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# signal_engine.py
+import math
+
+import numpy as np
+import pandas as pd
+
+from indicators import calculate_ew_volatility, calculate_signal, rolling_slope_array
+from jit import LazyJit
+from profiling import timed
+from streaming import ewm_decay
+
+SIGNAL_OUTPUTS = ("volatility", "signal", "smoothed_signal", "slope")
+
+
+def log_returns(close, prev_close=math.nan):
+    # Log returns along axis 0 of a 1-D or 2-D array; the first row uses
+    # prev_close. Ratios <= 0 or infinite (a zero or negative price on either
+    # side) give NaN.
+    close = np.asarray(close, dtype=np.float64)
+    prev = np.empty_like(close)
+    prev[0] = prev_close
+    prev[1:] = close[:-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = close / prev
+        return np.log(np.where((ratio > 0) & (ratio < np.inf), ratio, np.nan))
+
+
+# --- Fused EWM kernel ---
+
+def new_indicator_state():
+    # EW volatility: mean, cov, sum_wt, sum_wt2, old_wt, nobs; then weighted,
+    # old_wt, nobs for the signal and for the smoothed signal (see streaming.py)
+    return np.array([math.nan, 0.0, 1.0, 1.0, 1.0, 0.0,
+                     math.nan, 1.0, 0.0,
+                     math.nan, 1.0, 0.0])
+
+
+def _ewm_kernel(returns, state, vol_decay, signal_decay, smooth_decay,
+                volatility, signal, smoothed):
+    # EW volatility -> risk-adjusted signal -> smoothed signal in one pass over
+    # `returns`, continuing from `state` (updated in place) and writing into
+    # the three output arrays. Same recursions as streaming.EWStd / EWMean,
+    # i.e. pandas' adjust=True ewm, so results are bit-for-bit identical.
+    mean, cov, sum_wt, sum_wt2, vol_wt, vol_nobs = (
+        state[0], state[1], state[2], state[3], state[4], state[5])
+    sig_mean, sig_wt, sig_nobs = state[6], state[7], state[8]
+    sm_mean, sm_wt, sm_nobs = state[9], state[10], state[11]
+
+    for i in range(len(returns)):
+        # --- EW volatility (ewmcov recursion, bias=False) ---
+        x = returns[i]
+        if x == x:
+            vol_nobs += 1
+        if mean == mean:
+            sum_wt *= vol_decay
+            sum_wt2 *= vol_decay * vol_decay
+            vol_wt *= vol_decay
+            if x == x:
+                old_mean = mean
+                if old_mean != x:
+                    mean = ((vol_wt * old_mean) + x) / (vol_wt + 1.0)
+                cov = ((vol_wt * (cov + ((old_mean - mean) * (old_mean - mean))))
+                       + ((x - mean) * (x - mean))) / (vol_wt + 1.0)
+                sum_wt += 1.0
+                sum_wt2 += 1.0
+                vol_wt += 1.0
+        elif x == x:
+            mean = x
+        vol = math.nan
+        if vol_nobs >= 1:
+            numerator = sum_wt * sum_wt
+            denominator = numerator - sum_wt2
+            if denominator > 0:
+                var = (numerator / denominator) * cov
+                vol = 0.0 if var < 0 else math.sqrt(var)
+        volatility[i] = vol
+
+        # --- Risk-adjusted return, IEEE division like pandas ---
+        if vol != 0.0:
+            x = x / vol
+        elif x != x or x == 0.0:
+            x = math.nan
+        else:
+            x = math.inf if x > 0 else -math.inf
+
+        # --- Signal ---
+        if x == x:
+            sig_nobs += 1
+        if sig_mean == sig_mean:
+            sig_wt *= signal_decay
+            if x == x:
+                if sig_mean != x:
+                    sig_mean = ((sig_wt * sig_mean) + x) / (sig_wt + 1.0)
+                sig_wt += 1.0
+        elif x == x:
+            sig_mean = x
+        x = 100 * sig_mean if sig_nobs >= 1 else math.nan
+        signal[i] = x
+
+        # --- Smoothed signal ---
+        if x == x:
+            sm_nobs += 1
+        if sm_mean == sm_mean:
+            sm_wt *= smooth_decay
+            if x == x:
+                if sm_mean != x:
+                    sm_mean = ((sm_wt * sm_mean) + x) / (sm_wt + 1.0)
+                sm_wt += 1.0
+        elif x == x:
+            sm_mean = x
+        smoothed[i] = sm_mean if sm_nobs >= 1 else math.nan
+
+    state[0], state[1], state[2], state[3], state[4], state[5] = (
+        mean, cov, sum_wt, sum_wt2, vol_wt, vol_nobs)
+    state[6], state[7], state[8] = sig_mean, sig_wt, sig_nobs
+    state[9], state[10], state[11] = sm_mean, sm_wt, sm_nobs
+
+
+_ewm_kernel_jit = LazyJit(_ewm_kernel)
+
+
+def ewm_chunk(returns, state, halflife, signal_smooth_halflife):
+    # (volatility, signal, smoothed) for one chunk of a 1-D return series,
+    # carrying `state` across calls; used by the chunked intraday backtest
+    decays = (ewm_decay(halflife), ewm_decay(halflife), ewm_decay(signal_smooth_halflife))
+    n = len(returns)
+    # The fallback here is a Python loop, so numba is always worth loading
+    kernel = _ewm_kernel_jit.get(force=True)
+    if kernel is not None:
+        out = tuple(np.empty(n) for _ in range(3))
+        kernel(np.asarray(returns, dtype=np.float64), state, *decays, *out)
+        return out
+    py_state = state.tolist()
+    out = tuple([0.0] * n for _ in range(3))
+    _ewm_kernel(returns.tolist(), py_state, *decays, *out)
+    state[:] = py_state
+    return tuple(np.array(values) for values in out)
+
+
+def ewm_signals(returns, halflife, signal_smooth_halflife, outputs=SIGNAL_OUTPUTS):
+    # {name: array} for the requested EWM outputs ("volatility", "signal",
+    # "smoothed_signal") of 1-D or 2-D (bars x symbols) log returns.
+    # Outputs that aren't requested share one scratch column instead of
+    # getting a full-size array.
+    returns = np.asarray(returns, dtype=np.float64)
+    names = [name for name in SIGNAL_OUTPUTS[:3] if name in outputs]
+    kernel = _ewm_kernel_jit.get(returns.size)
+    if kernel is None:
+        # pandas' (compiled) ewm, bit-for-bit the same: faster than a Python
+        # loop without numba, and cheaper than loading numba for small inputs
+        frame = pd.DataFrame(returns.reshape(len(returns), -1))
+        volatility = calculate_ew_volatility(frame, halflife)
+        signal = 100 * calculate_signal(frame, volatility, halflife)
+        values = {"volatility": volatility, "signal": signal,
+                  "smoothed_signal": signal.ewm(halflife=signal_smooth_halflife).mean()}
+        return {name: values[name].to_numpy().reshape(returns.shape) for name in names}
+
+    decays = (ewm_decay(halflife), ewm_decay(halflife), ewm_decay(signal_smooth_halflife))
+    columns = returns.reshape(len(returns), -1, order="F")
+    out = {name: np.empty(columns.shape, order="F") for name in names}
+    scratch = np.empty(len(columns))
+    for j in range(columns.shape[1]):
+        kernel(
+            np.ascontiguousarray(columns[:, j]), new_indicator_state(), *decays,
+            *[out[name][:, j] if name in out else scratch for name in SIGNAL_OUTPUTS[:3]],
+        )
+    return {name: values.reshape(returns.shape, order="F") for name, values in out.items()}
+
+
+# --- Public entry point ---
+
+@timed()
+def compute_signals(close, halflife, signal_smooth_halflife, slope_window,
+                    outputs=SIGNAL_OUTPUTS):
+    # The whole signal chain from close prices: log returns -> EW volatility
+    # -> risk-adjusted signal -> smoothed signal -> rolling slope. `close` is a
+    # Series, a dates x symbols DataFrame or an array; returns {name: result}
+    # of the same kind for each name in `outputs`.
+    values = close.to_numpy(dtype=np.float64) if isinstance(close, (pd.Series, pd.DataFrame)) \
+        else np.asarray(close, dtype=np.float64)
+    ewm_outputs = set(outputs) | ({"smoothed_signal"} if "slope" in outputs else set())
+    if len(values):
+        out = ewm_signals(log_returns(values), halflife, signal_smooth_halflife, ewm_outputs)
+    else:
+        out = {name: np.empty(values.shape) for name in ewm_outputs}
+    if "slope" in outputs:
+        out["slope"] = rolling_slope_array(out["smoothed_signal"], slope_window)
+
+    return {name: _like(close, out[name]) for name in outputs}
+
+
+def _like(close, values):
+    if isinstance(close, pd.DataFrame):
+        return pd.DataFrame(values, index=close.index, columns=close.columns)
+    if isinstance(close, pd.Series):
+        return pd.Series(values, index=close.index, name=close.name)
+    return values
@@ -1,189 +1,539 @@
 # strategy.py
-import pandas as pd
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 
-def run_strategy(
-    symbol,
-    price_series,
-    signal_series,
-    slope_series,
-    stop_loss_series,
-    returns,
-    initial_capital,
-    require_positive_signal,
-    ax1, ax2, ax3,
-    enable_trailing_take_profit=True,
-    take_profit_trigger=0.10,      # new param (fraction, e.g. 0.10 = 10%)
-    take_profit_fraction=0.50      # new param (fraction, e.g. 0.50 = 50%)
-):
-    # Initialize variables
-    position = None
-    current_equity = initial_capital
-    cumulative_pct_return = 1.0
-    auto_trades = []
-
-    for i in range(1, len(slope_series) - 1):
-        prev_slope = slope_series.iloc[i - 1]
-        curr_slope = slope_series.iloc[i]
-        date = slope_series.index[i]
-
-        if date not in price_series or date not in signal_series or date not in stop_loss_series:
+from jit import LazyJit
+from profiling import timed
+from result_store import content_hash, pack_trades, unpack_trades
+from summary import trade_stats
+from trades import TradeLog, STOP_LOSS, TRAILING_STOP, SLOPE_SELL, FORCED_SELL
+
+
+# Open-position state carried between kernel calls, as a float64 array
+(IN_POSITION, ENTRY_BAR, ENTRY_PRICE, STOP_LOSS_PCT, STOP_LOSS_PRICE,
+ HIGHEST_PROFIT_PCT, TRAILING_STOP_PRICE, HAS_TRAILING_STOP) = range(8)
+
+
+def new_position_state():
+    return np.zeros(8, dtype=np.float64)
+
+
+def _backtest_kernel(slope, signal, price, stop, next_price, present, first, state,
+                     require_positive_signal, enable_trailing_take_profit,
+                     take_profit_trigger, take_profit_fraction):
+    # Buy / stop-loss / trailing-stop / slope-sell state machine over plain arrays.
+    # Bar i (from `first`) decides, the trade fills at next_price[i + 1]. Returns
+    # one row per closed trade: signal bar of the entry and exit, exit reason,
+    # stop-loss fraction, highest unrealized % and trailing stop price. A
+    # position still open at the end is left in `state` (updated in place), so
+    # a later call can continue it; its entry bar is relative to this call.
+    n = len(slope)
+    entry_bar = np.empty(n, dtype=np.int64)
+    exit_bar = np.empty(n, dtype=np.int64)
+    reason = np.empty(n, dtype=np.int64)
+    stop_pct = np.empty(n, dtype=np.float64)
+    highest_pct = np.empty(n, dtype=np.float64)
+    trailing_price = np.empty(n, dtype=np.float64)
+    count = 0
+
+    in_position = state[IN_POSITION] != 0
+    entry_i = int(state[ENTRY_BAR])
+    entry_price = state[ENTRY_PRICE]
+    stop_loss_pct = state[STOP_LOSS_PCT]
+    stop_loss_price = state[STOP_LOSS_PRICE]
+    highest_profit_pct = state[HIGHEST_PROFIT_PCT]
+    trailing_stop_price = state[TRAILING_STOP_PRICE]
+    has_trailing_stop = state[HAS_TRAILING_STOP] != 0
+
+    for i in range(first, n - 1):
+        if not present[i]:
             continue
+        prev_slope = slope[i - 1]
+        curr_slope = slope[i]
 
         # --- BUY ---
         buy_signal = prev_slope < 0 and curr_slope >= 0
         if require_positive_signal:
-            buy_signal = buy_signal and signal_series.loc[date] > 0
-
-        if buy_signal and position is None:
-            next_date = price_series.index[i + 1]
-            entry_price = price_series.loc[next_date]
-            volatility_stop_pct = stop_loss_series.loc[date]
-            stop_loss_price = entry_price * (1 - volatility_stop_pct)
-
-            position = {
-                'entry_time': next_date,
-                'entry_price': entry_price,
-                'shares': current_equity / entry_price,
-                'stop_loss_price': stop_loss_price,
-                'stop_loss_pct': volatility_stop_pct * 100,  # Save as percent
-                'highest_profit_pct': 0.0,
-                'trailing_stop_price': None
-            }
-
-            ax1.axvline(next_date, color='green', linestyle=':', alpha=0.5)
-            ax3.plot(next_date, curr_slope, 'go', markersize=8,
-                     label=f"{symbol} Buy" if len(auto_trades) == 0 else "")
+            buy_signal = buy_signal and signal[i] > 0
+
+        if buy_signal and not in_position:
+            in_position = True
+            entry_i = i
+            entry_price = next_price[i + 1]
+            stop_loss_pct = stop[i]
+            stop_loss_price = entry_price * (1 - stop_loss_pct)
+            highest_profit_pct = 0.0
+            trailing_stop_price = 0.0
+            has_trailing_stop = False
 
         # --- SELL ---
-        if position is not None:
-            shares = position['shares']
-            entry_price = position['entry_price']
-            stop_loss_price = position['stop_loss_price']
-            trailing_stop_price = position['trailing_stop_price']
-            highest_profit_pct = position['highest_profit_pct']
-
-            current_price = price_series.loc[date]
+        if in_position:
+            current_price = price[i]
             unrealized_pct = (current_price - entry_price) / entry_price * 100
 
-            # --- Update trailing stop if enabled ---
             if enable_trailing_take_profit:
                 if unrealized_pct >= take_profit_trigger * 100:
                     highest_profit_pct = max(highest_profit_pct, unrealized_pct)
                     new_trailing_stop = entry_price * (
                         1 + take_profit_fraction * highest_profit_pct / 100
                     )
-                    if trailing_stop_price is None:
+                    if not has_trailing_stop:
                         trailing_stop_price = new_trailing_stop
+                        has_trailing_stop = True
                     else:
                         trailing_stop_price = max(trailing_stop_price, new_trailing_stop)
 
-                    position['highest_profit_pct'] = highest_profit_pct
-                    position['trailing_stop_price'] = trailing_stop_price
-
-            # --- Check exit conditions ---
             stop_loss_triggered = current_price <= stop_loss_price
             trailing_stop_triggered = (
                 enable_trailing_take_profit
-                and trailing_stop_price is not None
+                and has_trailing_stop
                 and current_price <= trailing_stop_price
             )
             slope_sell = prev_slope > 0 and curr_slope <= 0
 
-            sell_signal = stop_loss_triggered or trailing_stop_triggered or slope_sell
+            if stop_loss_triggered or trailing_stop_triggered or slope_sell:
+                entry_bar[count] = entry_i
+                exit_bar[count] = i
+                if stop_loss_triggered:
+                    reason[count] = STOP_LOSS
+                elif trailing_stop_triggered:
+                    reason[count] = TRAILING_STOP
+                else:
+                    reason[count] = SLOPE_SELL
+                stop_pct[count] = stop_loss_pct
+                highest_pct[count] = highest_profit_pct
+                trailing_price[count] = trailing_stop_price if has_trailing_stop else np.nan
+                count += 1
+                in_position = False
 
-            if sell_signal:
-                next_date = price_series.index[i + 1]
-                exit_price = price_series.loc[next_date]
+    state[IN_POSITION] = 1.0 if in_position else 0.0
+    state[ENTRY_BAR] = entry_i
+    state[ENTRY_PRICE] = entry_price
+    state[STOP_LOSS_PCT] = stop_loss_pct
+    state[STOP_LOSS_PRICE] = stop_loss_price
+    state[HIGHEST_PROFIT_PCT] = highest_profit_pct
+    state[TRAILING_STOP_PRICE] = trailing_stop_price
+    state[HAS_TRAILING_STOP] = 1.0 if has_trailing_stop else 0.0
 
-                pct_return = (exit_price - entry_price) / entry_price
-                absolute_pnl = shares * (exit_price - entry_price)
+    return (entry_bar[:count], exit_bar[:count], reason[:count],
+            stop_pct[:count], highest_pct[:count], trailing_price[:count])
 
-                cumulative_pct_return *= (1 + pct_return)
-                current_equity *= (1 + pct_return)
 
-                if stop_loss_triggered:
-                    trade_type = "Stop Loss Sell"
-                elif trailing_stop_triggered:
-                    trade_type = "Trailing Stop Sell"
-                else:
-                    trade_type = "Slope Sell"
-
-                trade_color = (
-                    'red' if stop_loss_triggered
-                    else 'purple' if trailing_stop_triggered
-                    else 'black'
-                )
-
-                auto_trades.append({
-                    'symbol': symbol,
-                    'entry_time': position['entry_time'],
-                    'exit_time': next_date,
-                    'entry_price': entry_price,
-                    'exit_price': exit_price,
-                    'shares': shares,
-                    'pnl': absolute_pnl,
-                    'pct_return': pct_return * 100,
-                    'cumulative_pct_return': (cumulative_pct_return - 1) * 100,
-                    'equity': current_equity,
-                    'exit_reason': trade_type,
-                    'stop_loss_pct': position.get('stop_loss_pct', None),
-                    'highest_profit_pct': highest_profit_pct,
-                    'trailing_stop_price': trailing_stop_price
-                })
-
-                ax1.axvline(next_date, color=trade_color, linestyle=':', alpha=0.5)
-                ax3.plot(next_date, curr_slope, 'ro', markersize=8,
-                         label=f"{symbol} Sell" if len(auto_trades) == 1 else "")
-                position = None
-
-    # --- Forced sell at end of backtest ---
-    if position is not None:
-        final_date = price_series.index[-1]
-        final_price = price_series.iloc[-1]
-        shares = position['shares']
-        entry_price = position['entry_price']
-
-        pct_return = (final_price - entry_price) / entry_price
-        absolute_pnl = shares * (final_price - entry_price)
-
-        cumulative_pct_return *= (1 + pct_return)
-        current_equity *= (1 + pct_return)
-
-        auto_trades.append({
-            'symbol': symbol,
-            'entry_time': position['entry_time'],
-            'exit_time': final_date,
-            'entry_price': entry_price,
-            'exit_price': final_price,
-            'shares': shares,
-            'pnl': absolute_pnl,
-            'pct_return': pct_return * 100,
-            'cumulative_pct_return': (cumulative_pct_return - 1) * 100,
-            'equity': current_equity,
-            'exit_reason': "Forced Sell",
-            'stop_loss_pct': position.get('stop_loss_pct', None),
-            'highest_profit_pct': position.get('highest_profit_pct', None),
-            'trailing_stop_price': position.get('trailing_stop_price', None)
-        })
-
-        ax1.axvline(final_date, color='orange', linestyle=':', alpha=0.5)
-
-    # --- Plot ---
-    ax1.plot(price_series.index, price_series, label=f"{symbol} Price Series")
-    ax2.plot(signal_series.index, signal_series, label=f"{symbol} Smoothed Signal")
-    ax3.plot(slope_series.index, slope_series, label=f"{symbol} Slope")
-
-    # --- Highlight trades on cumulative return ---
-    price_series_subset = price_series.copy()
-    for trade in auto_trades:
-        entry = trade["entry_time"]
-        exit_ = trade["exit_time"]
-        pnl = trade["pnl"]
-
-        trade_slice = price_series_subset.loc[entry:exit_]
-        color = '#66FF00' if pnl >= 0 else 'red'
-        ax1.plot(trade_slice.index, trade_slice.values, color=color, linewidth=2)
+_backtest_kernel_jit = LazyJit(_backtest_kernel)
+
+
+# --- Vectorized exit search (without numba, or before it is loaded) ---
+
+def signal_bars(slope, signal, present, first, require_positive_signal):
+    # Sorted bars in [first, n - 2] where the strategy would buy (slope crosses
+    # up) and where it would slope-sell (slope crosses down). They don't depend
+    # on the stop or take-profit settings.
+    n = len(slope)
+    prev_slope = np.concatenate(([np.nan], slope[:-1]))
+    decides = present.copy()
+    decides[:first] = False
+    decides[n - 1:] = False
+    buy = decides & (prev_slope < 0) & (slope >= 0)
+    if require_positive_signal:
+        buy &= signal > 0
+    sell = decides & (prev_slope > 0) & (slope <= 0)
+    return np.flatnonzero(buy), np.flatnonzero(sell)
+
+
+def _first_exit(start, stop_at, price, present, entry_price, stop_loss_price,
+                highest_profit_pct, trailing_stop_price, has_trailing_stop, slope_sell,
+                enable_trailing_take_profit, take_profit_trigger, take_profit_fraction):
+    # Exit of a position held from bar `start`, searched over bars
+    # [start, stop_at] with array operations: the take-profit ratchet is a
+    # running max of the qualifying unrealized returns, and the exit is the
+    # first bar hitting the stop-loss or trailing stop, or stop_at itself when
+    # `slope_sell`. Returns (exit bar or -1, reason, highest %, trailing stop,
+    # has trailing stop) as of the exit (or the last bar searched).
+    current_price = price[start:stop_at + 1]
+    tradable = present[start:stop_at + 1]
+    highest = np.full(len(current_price), highest_profit_pct)
+    trailing = np.full(len(current_price), trailing_stop_price)
+    has = np.full(len(current_price), has_trailing_stop)
+    trailing_hit = np.zeros(len(current_price), dtype=bool)
+    if enable_trailing_take_profit:
+        unrealized_pct = (current_price - entry_price) / entry_price * 100
+        ratchet = tradable & (unrealized_pct >= take_profit_trigger * 100)
+        if ratchet.any():
+            highest = np.maximum(highest_profit_pct, np.maximum.accumulate(
+                np.where(ratchet, unrealized_pct, -np.inf)))
+            new_trailing_stop = entry_price * (1 + take_profit_fraction * highest / 100)
+            trailing = np.maximum.accumulate(np.where(ratchet, new_trailing_stop, -np.inf))
+            if has_trailing_stop:
+                trailing = np.maximum(trailing_stop_price, trailing)
+            has = has_trailing_stop | np.logical_or.accumulate(ratchet)
+            trailing = np.where(has, trailing, trailing_stop_price)
+        trailing_hit = tradable & has & (current_price <= trailing)
+
+    stop_hit = tradable & (current_price <= stop_loss_price)
+    hit = stop_hit | trailing_hit
+    hit[-1] |= slope_sell
+    if not hit.any():
+        return -1, -1, highest[-1], trailing[-1], bool(has[-1])
+    j = int(np.argmax(hit))
+    reason = STOP_LOSS if stop_hit[j] else TRAILING_STOP if trailing_hit[j] else SLOPE_SELL
+    return start + j, reason, highest[j], trailing[j], bool(has[j])
+
+
+def _search_backtest(slope, signal, price, stop, next_price, present, first, state,
+                     require_positive_signal, enable_trailing_take_profit,
+                     take_profit_trigger, take_profit_fraction):
+    # Same inputs, rows and state as _backtest_kernel, but the work is
+    # O(trades) NumPy searches instead of a Python step per bar: each position
+    # only looks at the bars up to the next slope-sell (its latest possible
+    # exit), and the next buy is the first buy bar after the exit.
+    n = len(slope)
+    buys, sells = signal_bars(slope, signal, present, first, require_positive_signal)
+    last = n - 2
+    rows = []
+
+    in_position = state[IN_POSITION] != 0
+    entry_i = int(state[ENTRY_BAR])
+    entry_price = state[ENTRY_PRICE]
+    stop_loss_pct = state[STOP_LOSS_PCT]
+    stop_loss_price = state[STOP_LOSS_PRICE]
+    highest_profit_pct = state[HIGHEST_PROFIT_PCT]
+    trailing_stop_price = state[TRAILING_STOP_PRICE]
+    has_trailing_stop = state[HAS_TRAILING_STOP] != 0
+
+    bar = first
+    while bar <= last:
+        if not in_position:
+            k = np.searchsorted(buys, bar)
+            if k == len(buys):
+                break
+            entry_i = bar = int(buys[k])
+            entry_price = next_price[bar + 1]
+            stop_loss_pct = stop[bar]
+            stop_loss_price = entry_price * (1 - stop_loss_pct)
+            highest_profit_pct = 0.0
+            trailing_stop_price = 0.0
+            has_trailing_stop = False
+            in_position = True
+
+        k = np.searchsorted(sells, bar)
+        stop_at = int(sells[k]) if k < len(sells) else last
+        exit_i, reason, highest_profit_pct, trailing_stop_price, has_trailing_stop = _first_exit(
+            bar, stop_at, price, present, entry_price, stop_loss_price, highest_profit_pct,
+            trailing_stop_price, has_trailing_stop, k < len(sells),
+            enable_trailing_take_profit, take_profit_trigger, take_profit_fraction,
+        )
+        if exit_i < 0:
+            break
+        rows.append((entry_i, exit_i, reason, stop_loss_pct, highest_profit_pct,
+                     trailing_stop_price if has_trailing_stop else np.nan))
+        in_position = False
+        bar = exit_i + 1
+
+    state[IN_POSITION] = 1.0 if in_position else 0.0
+    state[ENTRY_BAR] = entry_i
+    state[ENTRY_PRICE] = entry_price
+    state[STOP_LOSS_PCT] = stop_loss_pct
+    state[STOP_LOSS_PRICE] = stop_loss_price
+    state[HIGHEST_PROFIT_PCT] = highest_profit_pct
+    state[TRAILING_STOP_PRICE] = trailing_stop_price
+    state[HAS_TRAILING_STOP] = 1.0 if has_trailing_stop else 0.0
+
+    columns = list(zip(*rows)) or [()] * 6
+    return tuple(
+        np.array(values, dtype=dtype)
+        for values, dtype in zip(columns, (np.int64, np.int64, np.int64,
+                                           np.float64, np.float64, np.float64))
+    )
+
+
+def _align_inputs(price_series, signal_series, slope_series, stop_loss_series):
+    # Align everything on the slope index once. `present` marks bars whose date
+    # exists in every input; the fill price stays positional in price_series.
+    index = slope_series.index
+    present = (
+        index.isin(price_series.index)
+        & index.isin(signal_series.index)
+        & index.isin(stop_loss_series.index)
+    )
+    return (
+        slope_series.to_numpy(dtype=np.float64),
+        signal_series.reindex(index).to_numpy(dtype=np.float64),
+        price_series.reindex(index).to_numpy(dtype=np.float64),
+        stop_loss_series.reindex(index).to_numpy(dtype=np.float64),
+        price_series.to_numpy(dtype=np.float64),
+        np.asarray(present, dtype=np.bool_),
+    )
+
+
+def run_kernel(slope, signal, price, stop, next_price, present, first, state,
+               require_positive_signal, enable_trailing_take_profit=True,
+               take_profit_trigger=0.10, take_profit_fraction=0.50):
+    args = (
+        bool(require_positive_signal), bool(enable_trailing_take_profit),
+        float(take_profit_trigger), float(take_profit_fraction),
+    )
+    kernel = _backtest_kernel_jit.get(len(price) - int(first))
+    if kernel is not None:
+        return kernel(
+            slope, signal, price, stop, next_price, present, int(first), state, *args
+        )
+    return _search_backtest(
+        slope, signal, price, stop, next_price, present, int(first), state, *args
+    )
+
+
+def open_position_row(state, exit_bar=-1):
+    # Kernel-style row for the position left open in `state`
+    has_trailing_stop = state[HAS_TRAILING_STOP] != 0
+    return (
+        np.array([int(state[ENTRY_BAR])]), np.array([exit_bar]), np.array([FORCED_SELL]),
+        np.array([state[STOP_LOSS_PCT]]), np.array([state[HIGHEST_PROFIT_PCT]]),
+        np.array([state[TRAILING_STOP_PRICE] if has_trailing_stop else np.nan]),
+    )
+
+
+def backtest_arrays(slope, signal, price, stop, next_price, present,
+                    require_positive_signal, enable_trailing_take_profit=True,
+                    take_profit_trigger=0.10, take_profit_fraction=0.50):
+    # Whole-history backtest; a position still open at the end becomes a
+    # forced sell with exit bar -1
+    state = new_position_state()
+    rows = run_kernel(
+        slope, signal, price, stop, next_price, present, 1, state,
+        require_positive_signal, enable_trailing_take_profit,
+        take_profit_trigger, take_profit_fraction,
+    )
+    if state[IN_POSITION]:
+        rows = tuple(np.concatenate(pair) for pair in zip(rows, open_position_row(state)))
+    return rows
+
+
+def _build_trades(symbol, price_series, kernel_out, initial_capital, trade_log=None):
+    # Turns kernel output into trade rows with array arithmetic. Equity compounds
+    # left to right exactly like the old per-trade loop, so values are identical.
+    entry_bar, exit_bar, reason, stop_pct, highest_pct, trailing_price = kernel_out
+    prices = price_series.to_numpy(dtype=np.float64)
+    dates = price_series.index
+
+    entry_pos = entry_bar + 1
+    exit_pos = np.where(exit_bar >= 0, exit_bar + 1, len(prices) - 1)
+    entry_price = prices[entry_pos]
+    exit_price = prices[exit_pos]
+
+    pct_return = (exit_price - entry_price) / entry_price
+    growth = 1 + pct_return
+    equity = np.cumprod(np.concatenate(([float(initial_capital)], growth)))
+    cumulative = np.cumprod(np.concatenate(([1.0], growth)))[1:]
+    shares = equity[:-1] / entry_price
+
+    if trade_log is None:
+        trade_log = TradeLog(capacity=len(entry_pos))
+    trade_log.append_columns(
+        symbol,
+        entry_time=dates[entry_pos],
+        exit_time=dates[exit_pos],
+        entry_price=entry_price,
+        exit_price=exit_price,
+        shares=shares,
+        pnl=shares * (exit_price - entry_price),
+        pct_return=pct_return * 100,
+        cumulative_pct_return=(cumulative - 1) * 100,
+        equity=equity[1:],
+        exit_reason=reason,
+        stop_loss_pct=stop_pct * 100,  # Save as percent
+        highest_profit_pct=highest_pct,
+        trailing_stop_price=trailing_price,
+    )
+    return trade_log, entry_pos, exit_pos
+
+
+@timed()
+def simulate_strategy(
+    symbol,
+    price_series,
+    signal_series,
+    slope_series,
+    stop_loss_series,
+    initial_capital,
+    require_positive_signal,
+    enable_trailing_take_profit=True,
+    take_profit_trigger=0.10,
+    take_profit_fraction=0.50,
+    store=None
+):
+    # Headless backtest: returns the trades plus a compact plotting payload that
+    # plotting.plot_strategy can render later (or never, in batch runs).
+    # With a result_store.ResultStore, a run with the same aligned inputs and
+    # exit parameters is read back instead of recomputed.
+    arrays = _align_inputs(price_series, signal_series, slope_series, stop_loss_series)
+    exit_params = _exit_params(require_positive_signal, enable_trailing_take_profit,
+                               take_profit_trigger, take_profit_fraction)
+    key = None
+    if store is not None:
+        key = _result_key(symbol, price_series, arrays, initial_capital, exit_params)
+        stored = store.get(key)
+        if stored is not None:
+            return _load_result(*stored, symbol, price_series, signal_series, slope_series)
+
+    kernel_out = backtest_arrays(*arrays, *exit_params)
+    trades, entry_pos, exit_pos = _build_trades(
+        symbol, price_series, kernel_out, initial_capital
+    )
+
+    # Positions are into price_series; exit slope is NaN for the forced sell
+    slope = arrays[0]
+    entry_bar, exit_bar = kernel_out[0], kernel_out[1]
+    forced = exit_bar < 0
+    payload = {
+        'symbol': symbol,
+        'price_series': price_series,
+        'signal_series': signal_series,
+        'slope_series': slope_series,
+        'entry_pos': entry_pos,
+        'exit_pos': exit_pos,
+        'entry_slope': slope[entry_bar],
+        'exit_slope': np.where(forced, np.nan, slope[np.maximum(exit_bar, 0)]),
+        'exit_reason': kernel_out[2],
+        'pnl': trades['pnl'],
+    }
+    if store is not None:
+        store.put(key, *_save_result(trades, payload))
+    return trades, payload
+
+
+# --- Stored results ---
+
+PAYLOAD_ARRAYS = ("entry_pos", "exit_pos", "entry_slope", "exit_slope", "exit_reason")
+
+def _exit_params(require_positive_signal, enable_trailing_take_profit,
+                 take_profit_trigger, take_profit_fraction):
+    # Plain Python types, so numpy scalars from configs hash the same
+    return (bool(require_positive_signal), bool(enable_trailing_take_profit),
+            float(take_profit_trigger), float(take_profit_fraction))
+
+def _result_key(symbol, price_series, arrays, initial_capital, exit_params):
+    # price_series carries the fill dates; arrays are the aligned kernel inputs
+    return content_hash(("simulate_strategy", str(symbol), float(initial_capital),
+                         price_series, arrays, exit_params))
+
+def _save_result(trades, payload):
+    arrays, symbols = pack_trades(trades)
+    arrays.update({"payload." + name: payload[name] for name in PAYLOAD_ARRAYS})
+    metrics = {
+        **trade_stats(trades["pct_return"]),
+        "total_pnl": float(trades["pnl"].sum()),
+        "final_equity": float(trades["equity"][-1]) if len(trades) else None,
+    }
+    return arrays, {"symbols": symbols, "metrics": metrics}
+
+def _load_result(arrays, meta, symbol, price_series, signal_series, slope_series):
+    # The series are the caller's inputs; only the kernel output is read back
+    trades = unpack_trades(arrays, meta["symbols"])
+    payload = {
+        'symbol': symbol,
+        'price_series': price_series,
+        'signal_series': signal_series,
+        'slope_series': slope_series,
+        **{name: arrays["payload." + name] for name in PAYLOAD_ARRAYS},
+        'pnl': trades['pnl'],
+    }
+    return trades, payload
+
+
+def simulate_exit_grid(symbol, price_series, signal_series, slope_series, volatility_series,
+                       initial_capital, combos):
+    # One TradeLog per exit-parameter dict in `combos` (volatility_stop_multiplier,
+    # require_positive_signal, enable_trailing_take_profit, take_profit_trigger,
+    # take_profit_fraction) for a single symbol. Inputs are aligned once, so a
+    # take-profit grid only pays for the backtest itself. Trades are identical
+    # to simulate_strategy with stop_loss_series = multiplier * volatility.
+    slope, signal, price, volatility, next_price, present = _align_inputs(
+        price_series, signal_series, slope_series, volatility_series
+    )
+    logs = []
+    for combo in combos:
+        kernel_out = backtest_arrays(
+            slope, signal, price, combo["volatility_stop_multiplier"] * volatility,
+            next_price, present,
+            require_positive_signal=combo["require_positive_signal"],
+            enable_trailing_take_profit=combo["enable_trailing_take_profit"],
+            take_profit_trigger=combo["take_profit_trigger"],
+            take_profit_fraction=combo["take_profit_fraction"],
+        )
+        logs.append(_build_trades(symbol, price_series, kernel_out, initial_capital)[0])
+    return logs
+
+
+def run_strategy(
+    symbol,
+    price_series,
+    signal_series,
+    slope_series,
+    stop_loss_series,
+    returns,
+    initial_capital,
+    require_positive_signal,
+    ax1=None, ax2=None, ax3=None,
+    enable_trailing_take_profit=True,
+    take_profit_trigger=0.10,      # new param (fraction, e.g. 0.10 = 10%)
+    take_profit_fraction=0.50      # new param (fraction, e.g. 0.50 = 50%)
+):
+    # Without axes this runs headless and never imports matplotlib
+    auto_trades, payload = simulate_strategy(
+        symbol=symbol,
+        price_series=price_series,
+        signal_series=signal_series,
+        slope_series=slope_series,
+        stop_loss_series=stop_loss_series,
+        initial_capital=initial_capital,
+        require_positive_signal=require_positive_signal,
+        enable_trailing_take_profit=enable_trailing_take_profit,
+        take_profit_trigger=take_profit_trigger,
+        take_profit_fraction=take_profit_fraction,
+    )
+
+    if ax1 is not None:
+        from plotting import plot_strategy
+        plot_strategy(payload, ax1, ax2, ax3)
 
     return auto_trades
+
+
+def _simulate_task(kwargs):
+    return simulate_strategy(**kwargs)
+
+
+@timed()
+def simulate_universe(tasks, max_workers=None, store=None):
+    # Runs simulate_strategy for each keyword dict in `tasks` on a process pool;
+    # results come back in task order. With a store, tasks already in it are
+    # read back here and only the rest go to the pool (which stores them).
+    if store is not None:
+        tasks = [{**task, "store": store} for task in tasks]
+    if max_workers == 1 or len(tasks) <= 1:
+        return [simulate_strategy(**task) for task in tasks]
+
+    results = [None] * len(tasks)
+    if store is not None:
+        for i, task in enumerate(tasks):
+            results[i] = _stored_result(**task)
+    todo = [i for i, result in enumerate(results) if result is None]
+    if todo:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for i, result in zip(todo, pool.map(_simulate_task, [tasks[i] for i in todo])):
+                results[i] = result
+    return results
+
+
+def _stored_result(symbol, price_series, signal_series, slope_series, stop_loss_series,
+                   initial_capital, require_positive_signal, enable_trailing_take_profit=True,
+                   take_profit_trigger=0.10, take_profit_fraction=0.50, store=None):
+    # simulate_strategy's result from the store, or None
+    arrays = _align_inputs(price_series, signal_series, slope_series, stop_loss_series)
+    exit_params = _exit_params(require_positive_signal, enable_trailing_take_profit,
+                               take_profit_trigger, take_profit_fraction)
+    stored = store.get(_result_key(symbol, price_series, arrays, initial_capital, exit_params))
+    if stored is None:
+        return None
+    return _load_result(*stored, symbol, price_series, signal_series, slope_series)
@@ -0,0 +1,232 @@
+# streaming.py
+import math
+from collections import deque
+
+import numpy as np
+
+
+def ewm_decay(halflife):
+    # Same arithmetic as pandas' ewm(halflife=...) so online and batch results
+    # are bit-for-bit identical
+    decay = 1 - np.exp(np.log(0.5) / halflife)
+    com = float(1 / decay - 1)
+    alpha = 1.0 / (1.0 + com)
+    return 1.0 - alpha
+
+
+class EWMean:
+    # Online ewm(halflife).mean() with pandas defaults (adjust=True, ignore_na=False)
+    def __init__(self, halflife):
+        self.halflife = halflife
+        self.old_wt_factor = ewm_decay(halflife)
+        self.weighted = math.nan
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x):
+        is_observation = x == x
+        self.nobs += is_observation
+        if self.weighted == self.weighted:
+            self.old_wt *= self.old_wt_factor
+            if is_observation:
+                # avoid numerical errors on constant series
+                if self.weighted != x:
+                    self.weighted = ((self.old_wt * self.weighted) + x) / (self.old_wt + 1.0)
+                self.old_wt += 1.0
+        elif is_observation:
+            self.weighted = x
+        return self.value
+
+    @property
+    def value(self):
+        return self.weighted if self.nobs >= 1 else math.nan
+
+    def to_dict(self):
+        return {"halflife": self.halflife, "weighted": self.weighted,
+                "old_wt": self.old_wt, "nobs": self.nobs}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state["halflife"])
+        obj.weighted = state["weighted"]
+        obj.old_wt = state["old_wt"]
+        obj.nobs = state["nobs"]
+        return obj
+
+
+class EWStd:
+    # Online ewm(halflife).std() (bias=False), following pandas' ewmcov recursion
+    def __init__(self, halflife):
+        self.halflife = halflife
+        self.old_wt_factor = ewm_decay(halflife)
+        self.mean = math.nan
+        self.cov = 0.0
+        self.sum_wt = 1.0
+        self.sum_wt2 = 1.0
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x):
+        is_observation = x == x
+        self.nobs += is_observation
+        if self.mean == self.mean:
+            factor = self.old_wt_factor
+            self.sum_wt *= factor
+            self.sum_wt2 *= factor * factor
+            self.old_wt *= factor
+            if is_observation:
+                old_wt = self.old_wt
+                old_mean = self.mean
+                # avoid numerical errors on constant series
+                if old_mean != x:
+                    self.mean = ((old_wt * old_mean) + x) / (old_wt + 1.0)
+                self.cov = ((old_wt * (self.cov + ((old_mean - self.mean) * (old_mean - self.mean))))
+                            + ((x - self.mean) * (x - self.mean))) / (old_wt + 1.0)
+                self.sum_wt += 1.0
+                self.sum_wt2 += 1.0
+                self.old_wt += 1.0
+        elif is_observation:
+            self.mean = x
+        return self.value
+
+    @property
+    def value(self):
+        if self.nobs < 1:
+            return math.nan
+        numerator = self.sum_wt * self.sum_wt
+        denominator = numerator - self.sum_wt2
+        if not denominator > 0:
+            return math.nan
+        var = (numerator / denominator) * self.cov
+        if var < 0:
+            return 0.0
+        return math.sqrt(var) if var == var else math.nan
+
+    def to_dict(self):
+        return {"halflife": self.halflife, "mean": self.mean, "cov": self.cov,
+                "sum_wt": self.sum_wt, "sum_wt2": self.sum_wt2,
+                "old_wt": self.old_wt, "nobs": self.nobs}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state["halflife"])
+        for name in ("mean", "cov", "sum_wt", "sum_wt2", "old_wt", "nobs"):
+            setattr(obj, name, state[name])
+        return obj
+
+
+class RollingSlope:
+    # Online rolling_slope: O(window) per bar over a ring buffer of the last
+    # `window` values. Agrees with indicators.rolling_slope to within its
+    # documented tolerance (the batch version uses running sums).
+    def __init__(self, window):
+        self.window = window
+        t_mean = (window - 1) / 2.0
+        sxx = window * (window * window - 1) / 12.0
+        self.weights = [(t - t_mean) / sxx for t in range(window)]
+        self.values = deque(maxlen=window)
+
+    def update(self, y):
+        self.values.append(y)
+        return self.value
+
+    @property
+    def value(self):
+        if self.window < 2 or len(self.values) < self.window:
+            return math.nan
+        slope = 0.0
+        for w, y in zip(self.weights, self.values):
+            slope += w * y
+        return slope
+
+    def to_dict(self):
+        return {"window": self.window, "values": list(self.values)}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state["window"])
+        obj.values.extend(state["values"])
+        return obj
+
+
+class SignalState:
+    # Full signal chain fed one close at a time: log return -> EW volatility ->
+    # risk-adjusted signal -> smoothing -> rolling slope -> crossing.
+    def __init__(self, halflife, signal_smooth_halflife, slope_window):
+        self.volatility = EWStd(halflife)
+        self.signal = EWMean(halflife)
+        self.smoothed_signal = EWMean(signal_smooth_halflife)
+        self.slope = RollingSlope(slope_window)
+        self.last_close = math.nan
+        self.last_slope = math.nan
+        self.bars = 0
+
+    def update(self, close):
+        ratio = _divide(close, self.last_close)
+        # np.log rather than math.log: they can differ in the last bit
+        ret = float(np.log(ratio)) if ratio > 0 else math.nan
+        self.last_close = close
+
+        vol = self.volatility.update(ret)
+        rar = _divide(ret, vol)
+        signal = 100 * self.signal.update(rar)
+        smoothed = self.smoothed_signal.update(signal)
+        prev_slope, curr_slope = self.last_slope, self.slope.update(smoothed)
+        self.last_slope = curr_slope
+        self.bars += 1
+
+        if prev_slope < 0 and curr_slope >= 0:
+            crossing = "buy"
+        elif prev_slope > 0 and curr_slope <= 0:
+            crossing = "sell"
+        else:
+            crossing = None
+
+        return {
+            "volatility": vol,
+            "signal": signal,
+            "smoothed_signal": smoothed,
+            "slope": curr_slope,
+            "prev_slope": prev_slope,
+            "crossing": crossing,
+        }
+
+    def feed(self, closes):
+        # Convenience for warming up from history; returns the last update
+        out = None
+        for close in closes:
+            out = self.update(float(close))
+        return out
+
+    def to_dict(self):
+        return {
+            "volatility": self.volatility.to_dict(),
+            "signal": self.signal.to_dict(),
+            "smoothed_signal": self.smoothed_signal.to_dict(),
+            "slope": self.slope.to_dict(),
+            "last_close": self.last_close,
+            "last_slope": self.last_slope,
+            "bars": self.bars,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls.__new__(cls)
+        obj.volatility = EWStd.from_dict(state["volatility"])
+        obj.signal = EWMean.from_dict(state["signal"])
+        obj.smoothed_signal = EWMean.from_dict(state["smoothed_signal"])
+        obj.slope = RollingSlope.from_dict(state["slope"])
+        obj.last_close = state["last_close"]
+        obj.last_slope = state["last_slope"]
+        obj.bars = state["bars"]
+        return obj
+
+
+def _divide(a, b):
+    # IEEE division like pandas (x / 0 -> +-inf, 0 / 0 -> nan)
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a != a or a == 0:
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
@@ -1,77 +1,124 @@
 # summary.py
 
+import numpy as np
 import pandas as pd
 
-def summarize_trades(trades, asset_config):
-    if not trades:
-        print("No trades executed.")
-        return
-
-    # Convert trade list to DataFrame
-    summary_df = pd.DataFrame(trades)
-
-    # --- Portfolio-Level Summary ---
-    portfolio_start_value = sum(config["initial_capital"] for config in asset_config.values())
-    portfolio_final_value = summary_df.groupby("symbol")["equity"].last().sum()
-    portfolio_pnl = portfolio_final_value - portfolio_start_value
-    portfolio_return_pct = (portfolio_final_value / portfolio_start_value - 1) * 100
-
+from profiling import timed
+from trades import TradeLog, TRADE_COLUMNS
+
+def trade_stats(pct_returns):
+    # Trade count, win rate and expected return per trade (both in %)
+    pct_returns = np.asarray(pct_returns, dtype=np.float64)
+    total_trades = len(pct_returns)
+    if total_trades == 0:
+        return {"trades": 0, "win_rate": 0.0, "expected_return": 0.0}
+
+    wins = pct_returns[pct_returns > 0]
+    losses = pct_returns[pct_returns <= 0]
+
+    p_win = len(wins) / total_trades
+    p_loss = 1 - p_win
+
+    avg_win_return = wins.mean() if len(wins) else 0
+    avg_loss_return = losses.mean() if len(losses) else 0
+
+    return {
+        "trades": total_trades,
+        "win_rate": p_win * 100,
+        "expected_return": p_win * avg_win_return + p_loss * avg_loss_return,
+    }
+
+def trades_frame(trades):
+    # Accepts a TradeLog, a list of trade dicts or an existing DataFrame
+    if isinstance(trades, pd.DataFrame):
+        return trades.copy()
+    if isinstance(trades, TradeLog):
+        return trades.to_frame()
+    return pd.DataFrame(trades, columns=list(TRADE_COLUMNS))
+
+def symbol_stats(summary_df):
+    # Per-symbol statistics from a single groupby over the trade frame
+    symbols = summary_df["symbol"].astype(object)
+    pct_return = summary_df["pct_return"]
+    wins = pct_return > 0
+    grouped = summary_df.groupby(symbols, sort=False)
+
+    stats = pd.DataFrame({
+        "trades": grouped.size(),
+        "total_pnl": grouped["pnl"].sum(),
+        "final_equity": grouped["equity"].last(),
+        "win_rate": wins.groupby(symbols, sort=False).mean() * 100,
+        "avg_win_return": pct_return.where(wins).groupby(symbols, sort=False).mean(),
+        "avg_loss_return": pct_return.where(~wins).groupby(symbols, sort=False).mean(),
+    })
+    stats[["avg_win_return", "avg_loss_return"]] = stats[["avg_win_return", "avg_loss_return"]].fillna(0)
+    p_win = stats["win_rate"] / 100
+    stats["expected_return"] = p_win * stats["avg_win_return"] + (1 - p_win) * stats["avg_loss_return"]
+    stats.index.name = "symbol"
+    return stats
+
+def portfolio_stats(stats, asset_config):
+    start_value = sum(config["initial_capital"] for config in asset_config.values())
+    final_value = stats["final_equity"].sum()
+    return {
+        "start_value": start_value,
+        "final_value": final_value,
+        "pnl": final_value - start_value,
+        "return_pct": (final_value / start_value - 1) * 100,
+    }
+
+def daily_pnl(summary_df):
+    exit_date = pd.to_datetime(summary_df["exit_time"]).dt.date
+    daily = summary_df.groupby(exit_date)["pnl"].sum().reset_index()
+    daily.columns = ["date", "daily_pnl"]
+    return daily
+
+def print_summary(summary_df, stats, portfolio, asset_config):
     # --- Per-Symbol Summary ---
+    trades_by_symbol = dict(tuple(summary_df.groupby(summary_df["symbol"].astype(object), sort=False)))
     for symbol in asset_config:
-        df = summary_df[summary_df["symbol"] == symbol]
-        if df.empty:
+        if symbol not in stats.index:
             continue
+        row = stats.loc[symbol]
 
         print(f"\n>> {symbol} SUMMARY")
-
-        total_trades = len(df)
-        total_pnl = df["pnl"].sum()
-        final_equity = df["equity"].iloc[-1]
-
-        # Compute expected return
-        win_trades = df[df["pct_return"] > 0]
-        loss_trades = df[df["pct_return"] <= 0]
-
-        p_win = len(win_trades) / total_trades
-        p_loss = 1 - p_win
-
-        avg_win_return = win_trades["pct_return"].mean() if not win_trades.empty else 0
-        avg_loss_return = loss_trades["pct_return"].mean() if not loss_trades.empty else 0
-
-        expected_return = p_win * avg_win_return + p_loss * avg_loss_return
-
-        print(f"Trades: {total_trades} | Total PnL: ${total_pnl:.2f} | Final Equity: ${final_equity:.2f}")
-        print(f"Expected Return per Trade: {expected_return:.2f}% | Win Rate: {p_win * 100:.2f}%")
+        print(f"Trades: {int(row['trades'])} | Total PnL: ${row['total_pnl']:.2f} | Final Equity: ${row['final_equity']:.2f}")
+        print(f"Expected Return per Trade: {row['expected_return']:.2f}% | Win Rate: {row['win_rate']:.2f}%")
 
         # Print each trade with return
-        for _, t in df.iterrows():
-            highest_profit = t.get('highest_profit_pct', None)
-            trailing_stop = t.get('trailing_stop_price', None)
-
-            highest_profit_str = f"{highest_profit:.2f}%" if highest_profit is not None else "N/A"
-            trailing_stop_str = f"${trailing_stop:.2f}" if trailing_stop is not None else "N/A"
+        for t in trades_by_symbol[symbol].itertuples(index=False):
+            highest_profit_str = f"{t.highest_profit_pct:.2f}%" if pd.notna(t.highest_profit_pct) else "N/A"
+            trailing_stop_str = f"${t.trailing_stop_price:.2f}" if pd.notna(t.trailing_stop_price) else "N/A"
 
             print(
-                f"{t['entry_time'].date()} → {t['exit_time'].date()} | "
-                f"Entry: ${t['entry_price']:.2f} | Exit: ${t['exit_price']:.2f} | "
-                f"PnL: ${t['pnl']:.2f} | Return: {t['pct_return']:.2f}% | "
-                f"Stop Loss %: {t['stop_loss_pct']:.2f}% | "
+                f"{t.entry_time.date()} → {t.exit_time.date()} | "
+                f"Entry: ${t.entry_price:.2f} | Exit: ${t.exit_price:.2f} | "
+                f"PnL: ${t.pnl:.2f} | Return: {t.pct_return:.2f}% | "
+                f"Stop Loss %: {t.stop_loss_pct:.2f}% | "
                 f"Max Profit Seen: {highest_profit_str} | "
                 f"Trailing Stop Used: {trailing_stop_str} | "
-                f"Reason: {t['exit_reason']}"
+                f"Reason: {t.exit_reason}"
             )
 
     # --- Portfolio Summary ---
     print("\n=== PORTFOLIO SUMMARY ===")
-    print(f"Starting Value: ${portfolio_start_value:.2f}")
-    print(f"Final Value:   ${portfolio_final_value:.2f}")
-    print(f"Total PnL:     ${portfolio_pnl:.2f}")
-    print(f"Return:        {portfolio_return_pct:.2f}%")
-
-    # --- Daily Portfolio PnL ---
-    summary_df['exit_date'] = pd.to_datetime(summary_df['exit_time']).dt.date
-    daily_pnl = summary_df.groupby('exit_date')['pnl'].sum().reset_index()
-    daily_pnl.columns = ['date', 'daily_pnl']
+    print(f"Starting Value: ${portfolio['start_value']:.2f}")
+    print(f"Final Value:   ${portfolio['final_value']:.2f}")
+    print(f"Total PnL:     ${portfolio['pnl']:.2f}")
+    print(f"Return:        {portfolio['return_pct']:.2f}%")
+
+@timed()
+def summarize_trades(trades, asset_config, verbose=True):
+    # Computes the trade frame and daily PnL; printing is optional
+    summary_df = trades_frame(trades)
+    if summary_df.empty:
+        if verbose:
+            print("No trades executed.")
+        return summary_df, daily_pnl(summary_df)
+
+    if verbose:
+        stats = symbol_stats(summary_df)
+        print_summary(summary_df, stats, portfolio_stats(stats, asset_config), asset_config)
 
     # Return both for plotting or saving
-    return summary_df, daily_pnl
+    return summary_df, daily_pnl(summary_df)
@@ -0,0 +1,174 @@
+# sweep.py
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import config
+from indicators import rolling_slope
+from signal_engine import ewm_signals, log_returns
+from strategy import simulate_exit_grid, simulate_strategy
+from summary import trade_stats
+from trades import TradeLog
+
+INDICATOR_PARAMS = ("halflife", "signal_smooth_halflife", "slope_window")
+EXIT_PARAMS = (
+    "volatility_stop_multiplier", "require_positive_signal",
+    "enable_trailing_take_profit", "take_profit_trigger", "take_profit_fraction",
+)
+
+
+def expand_grid(grid):
+    # {"halflife": [50, 100], ...} -> list of complete parameter dicts; anything
+    # not in the grid falls back to the value in config.py
+    grid = {
+        name: list(values) if isinstance(values, (list, tuple, range)) else [values]
+        for name, values in grid.items()
+    }
+    unknown = set(grid) - set(INDICATOR_PARAMS) - set(EXIT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    for name in INDICATOR_PARAMS + EXIT_PARAMS:
+        grid.setdefault(name, [getattr(config, name)])
+
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+class IndicatorCache:
+    # Memoizes every indicator frame by the parameters it depends on, so each
+    # distinct volatility / smoothed signal / slope is computed once per sweep.
+    # Volatility and smoothed signal come from one signal_engine pass.
+    def __init__(self, price_close):
+        self.index = price_close.index
+        self.columns = price_close.columns
+        self.returns = log_returns(price_close.to_numpy(dtype=np.float64))
+        self._memo = {}
+
+    def _get(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def _frame(self, values):
+        return pd.DataFrame(values, index=self.index, columns=self.columns)
+
+    def _ewm(self, halflife, signal_smooth_halflife, outputs):
+        out = ewm_signals(self.returns, halflife, signal_smooth_halflife, outputs)
+        return {name: self._frame(values) for name, values in out.items()}
+
+    def volatility(self, halflife):
+        # Volatility doesn't depend on the smoothing halflife
+        return self._get(
+            ("volatility", halflife),
+            lambda: self._ewm(halflife, halflife, ("volatility",))["volatility"],
+        )
+
+    def smoothed_signal(self, halflife, signal_smooth_halflife):
+        def compute():
+            out = self._ewm(halflife, signal_smooth_halflife, ("volatility", "smoothed_signal"))
+            self._memo.setdefault(("volatility", halflife), out["volatility"])
+            return out["smoothed_signal"]
+        return self._get(("smoothed_signal", halflife, signal_smooth_halflife), compute)
+
+    def slope(self, halflife, signal_smooth_halflife, slope_window):
+        return self._get(
+            ("slope", halflife, signal_smooth_halflife, slope_window),
+            lambda: rolling_slope(
+                self.smoothed_signal(halflife, signal_smooth_halflife), slope_window
+            ),
+        )
+
+
+def run_combo(inputs, combo, initial_capital):
+    # Backtests one parameter combination on (price_open, smoothed_signal, slope,
+    # volatility) frames; returns the metrics row and the combined TradeLog
+    price_open, smoothed_signal, slope, volatility = inputs
+    trades = TradeLog()
+    final_value = 0.0
+    for symbol in price_open.columns:
+        symbol_trades, _ = simulate_strategy(
+            symbol=symbol,
+            price_series=price_open[symbol],
+            signal_series=smoothed_signal[symbol],
+            slope_series=slope[symbol],
+            stop_loss_series=combo["volatility_stop_multiplier"] * volatility[symbol],
+            initial_capital=initial_capital,
+            require_positive_signal=combo["require_positive_signal"],
+            enable_trailing_take_profit=combo["enable_trailing_take_profit"],
+            take_profit_trigger=combo["take_profit_trigger"],
+            take_profit_fraction=combo["take_profit_fraction"],
+        )
+        trades.extend(symbol_trades)
+        final_value += symbol_trades["equity"][-1] if len(symbol_trades) else initial_capital
+    return _combo_row(combo, trades, final_value, initial_capital * len(price_open.columns)), trades
+
+
+def _combo_row(combo, trades, final_value, start_value):
+    return {
+        **combo,
+        "return_pct": (final_value / start_value - 1) * 100,
+        **trade_stats(trades["pct_return"]),
+    }
+
+
+def _run_group(task):
+    # Runs every exit-parameter combination that shares one set of indicators;
+    # each symbol's inputs are aligned once for the whole group
+    inputs, combos, initial_capital = task
+    price_open, smoothed_signal, slope, volatility = inputs
+    trades = [TradeLog() for _ in combos]
+    final_values = [0.0] * len(combos)
+    for symbol in price_open.columns:
+        logs = simulate_exit_grid(
+            symbol, price_open[symbol], smoothed_signal[symbol], slope[symbol],
+            volatility[symbol], initial_capital, combos,
+        )
+        for k, log in enumerate(logs):
+            trades[k].extend(log)
+            final_values[k] += log["equity"][-1] if len(log) else initial_capital
+    start_value = initial_capital * len(price_open.columns)
+    return [
+        _combo_row(combo, log, final_value, start_value)
+        for combo, log, final_value in zip(combos, trades, final_values)
+    ]
+
+
+def run_sweep(price_close, price_open, grid, initial_capital=10000, max_workers=None):
+    # Backtests every combination in `grid` over all symbols (columns) and returns
+    # one row of metrics per combination. Indicators are computed once per
+    # distinct (halflife, signal_smooth_halflife, slope_window) in this process;
+    # the strategy runs are spread over a process pool.
+    if isinstance(price_close, pd.Series):
+        price_close, price_open = price_close.to_frame(), price_open.to_frame()
+
+    groups = {}
+    for combo in expand_grid(grid):
+        key = tuple(combo[name] for name in INDICATOR_PARAMS)
+        groups.setdefault(key, []).append(combo)
+
+    # Each group is split into about one chunk per worker, so a grid over exit
+    # parameters alone still fills the pool
+    workers = 1 if max_workers == 1 else max_workers or os.cpu_count() or 1
+    cache = IndicatorCache(price_close)
+    tasks = []
+    for (hl, shl, window), combos in groups.items():
+        warmup = max(hl, shl, window)
+        inputs = (
+            price_open.iloc[warmup:],
+            cache.smoothed_signal(hl, shl).iloc[warmup:],
+            cache.slope(hl, shl, window).iloc[warmup:],
+            cache.volatility(hl).iloc[warmup:],
+        )
+        chunk = -(-len(combos) // workers)
+        for first in range(0, len(combos), chunk):
+            tasks.append((inputs, combos[first:first + chunk], initial_capital))
+
+    if max_workers == 1:
+        results = list(map(_run_group, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_run_group, tasks))
+    return pd.DataFrame([row for rows in results for row in rows])
@@ -0,0 +1,55 @@
+# synthetic.py
+import numpy as np
+import pandas as pd
+
+# (daily volatility, probability of staying in the regime each bar)
+DEFAULT_REGIMES = ((0.008, 0.995), (0.025, 0.98))
+
+
+def synthetic_ohlc(n_bars, seed=0, start="2000-01-03", freq="B", drift=0.0003,
+                   regimes=DEFAULT_REGIMES, start_price=100.0):
+    # Reproducible GBM bars whose volatility follows a Markov chain over `regimes`
+    rng = np.random.default_rng(seed)
+    vols = np.array([vol for vol, _ in regimes])
+    stay = np.array([p for _, p in regimes])
+
+    # Regime path drawn run by run: geometric run lengths, then a jump to a
+    # random other regime
+    regime = np.zeros(n_bars, dtype=np.int64)
+    pos, current = 0, 0
+    while len(regimes) > 1 and pos < n_bars:
+        length = rng.geometric(1 - stay[current])
+        regime[pos:pos + length] = current
+        pos += length
+        current = (current + rng.integers(1, len(regimes))) % len(regimes)
+    sigma = vols[regime]
+
+    log_returns = (drift - 0.5 * sigma ** 2) + sigma * rng.standard_normal(n_bars)
+    close = start_price * np.exp(np.cumsum(log_returns))
+    prev_close = np.concatenate(([start_price], close[:-1]))
+    open_ = prev_close * np.exp(0.25 * sigma * rng.standard_normal(n_bars))
+    wick = np.abs(0.5 * sigma * rng.standard_normal((2, n_bars)))
+    high = np.maximum(open_, close) * np.exp(wick[0])
+    low = np.minimum(open_, close) * np.exp(-wick[1])
+
+    index = pd.date_range(start, periods=n_bars, freq=freq, name="Date")
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close}, index=index)
+
+
+def synthetic_universe(n_symbols, n_bars, seed=0, **kwargs):
+    # {symbol: OHLC frame}, the same shape data.download_universe returns
+    return {
+        f"SYN{i:04d}": synthetic_ohlc(n_bars, seed=seed + i, **kwargs)
+        for i in range(n_symbols)
+    }
+
+
+def synthetic_source(n_bars=10000, seed=0, **kwargs):
+    # Offline price source for data.download_price_data; each symbol gets its
+    # own deterministic series covering n_bars from the default start date
+    def source(symbol, start_date, end_date):
+        symbol_seed = seed + sum(symbol.encode())
+        data = synthetic_ohlc(n_bars, seed=symbol_seed, **kwargs)
+        index = data.index
+        return data[(index >= pd.Timestamp(start_date)) & (index < pd.Timestamp(end_date))]
+    return source
@@ -0,0 +1,20 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import signal_engine  # noqa: E402
+import strategy  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_kernels(monkeypatch):
+    # Every test starts with the numba kernels unloaded, as in a new process,
+    # so which path runs doesn't depend on the tests before it
+    for lazy in (strategy._backtest_kernel_jit, signal_engine._ewm_kernel_jit):
+        monkeypatch.setattr(lazy, "compiled", None)
+        monkeypatch.setattr(lazy, "work", 0)
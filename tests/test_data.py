@@ -0,0 +1,57 @@
+# tests/test_data.py
+import pandas as pd
+import pytest
+
+from data import download_price_data, file_source
+from synthetic import synthetic_ohlc
+
+
+@pytest.fixture
+def prices_dir(tmp_path):
+    synthetic_ohlc(6000, seed=3, start="2010-01-04").to_csv(tmp_path / "SYM.csv")
+    return tmp_path
+
+
+def flaky(source, outages):
+    # Returns an empty frame (yfinance's failure signal) for the first `outages` calls
+    calls = []
+
+    def fetch(symbol, start_date, end_date):
+        calls.append((start_date, end_date))
+        if len(calls) <= outages:
+            return source(symbol, start_date, end_date).iloc[:0]
+        return source(symbol, start_date, end_date)
+    fetch.calls = calls
+    return fetch
+
+
+def test_cached_download_matches_source(prices_dir, tmp_path):
+    source = file_source(str(prices_dir))
+    cache = str(tmp_path / "cache")
+    download_price_data("SYM", "2015-01-01", "2018-01-01", cache_dir=cache, source=source)
+    data = download_price_data("SYM", "2012-01-01", "2020-01-01", cache_dir=cache, source=source)
+    pd.testing.assert_frame_equal(data, source("SYM", "2012-01-01", "2020-01-01"), check_freq=False)
+
+
+def test_fully_cached_range_skips_source(prices_dir, tmp_path):
+    source = flaky(file_source(str(prices_dir)), outages=0)
+    cache = str(tmp_path / "cache")
+    download_price_data("SYM", "2012-01-01", "2020-01-01", cache_dir=cache, source=source)
+    download_price_data("SYM", "2014-01-01", "2019-01-01", cache_dir=cache, source=source)
+    assert len(source.calls) == 1
+
+
+@pytest.mark.parametrize("outages", [1, 2])
+def test_empty_head_or_tail_is_fetched_again(prices_dir, tmp_path, outages):
+    source = file_source(str(prices_dir))
+    cache = str(tmp_path / "cache")
+    download_price_data("SYM", "2015-01-01", "2018-01-01", cache_dir=cache, source=source)
+
+    # The head fails first, then the tail too
+    outage = flaky(source, outages)
+    partial = download_price_data("SYM", "2012-01-01", "2020-01-01", cache_dir=cache, source=outage)
+    expected = source("SYM", "2012-01-01", "2020-01-01")
+    assert len(partial) < len(expected)
+
+    healed = download_price_data("SYM", "2012-01-01", "2020-01-01", cache_dir=cache, source=source)
+    pd.testing.assert_frame_equal(healed, expected, check_freq=False)
@@ -0,0 +1,258 @@
+# tests/test_equivalence.py
+# Every fast path against the implementation it replaced, on seeded random
+# inputs with NaN gaps and missing dates
+import numpy as np
+import pandas as pd
+import pytest
+
+import jit
+import strategy
+from intraday import stream_backtest
+from portfolio import simulate_portfolio
+from signal_engine import compute_signals
+from streaming import SignalState
+from synthetic import synthetic_ohlc
+
+from test_indicators import documented_bound
+
+SEEDS = range(12)
+EXIT_SETTINGS = [
+    dict(require_positive_signal=False, enable_trailing_take_profit=True,
+         take_profit_trigger=0.05, take_profit_fraction=0.5),
+    dict(require_positive_signal=True, enable_trailing_take_profit=True,
+         take_profit_trigger=0.02, take_profit_fraction=0.8),
+    dict(require_positive_signal=False, enable_trailing_take_profit=False,
+         take_profit_trigger=0.10, take_profit_fraction=0.5),
+]
+
+
+def random_inputs(seed, n=400, gaps=True):
+    # Slope noisy enough to cross zero often, stops tight enough to trigger
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2001-01-01", periods=n)
+    price = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, n))), index=index)
+    signal = pd.Series(rng.normal(0.2, 1.0, n), index=index)
+    slope = pd.Series(np.convolve(rng.normal(size=n + 4), np.ones(5) / 5, "valid"), index=index)
+    stop = pd.Series(rng.uniform(0.01, 0.08, n), index=index)
+    if gaps:
+        for series in (price, signal, slope, stop):
+            series[rng.random(n) < 0.03] = np.nan
+        # Dates missing from some inputs only
+        signal = signal.drop(index[rng.random(n) < 0.02])
+        stop = stop.drop(index[rng.random(n) < 0.02])
+    return price, signal, slope, stop
+
+
+def reference_trades(price_series, signal_series, slope_series, stop_loss_series,
+                     initial_capital, require_positive_signal, enable_trailing_take_profit,
+                     take_profit_trigger, take_profit_fraction):
+    # The original per-bar .loc / .iloc loop from run_strategy, without plotting
+    position = None
+    current_equity = initial_capital
+    cumulative_pct_return = 1.0
+    trades = []
+
+    def close(exit_time, exit_price, reason, highest_profit_pct, trailing_stop_price):
+        nonlocal current_equity, cumulative_pct_return
+        entry_price = position["entry_price"]
+        pct_return = (exit_price - entry_price) / entry_price
+        cumulative_pct_return *= 1 + pct_return
+        current_equity *= 1 + pct_return
+        trades.append({
+            "entry_time": position["entry_time"],
+            "exit_time": exit_time,
+            "entry_price": entry_price,
+            "exit_price": exit_price,
+            "shares": position["shares"],
+            "pnl": position["shares"] * (exit_price - entry_price),
+            "pct_return": pct_return * 100,
+            "cumulative_pct_return": (cumulative_pct_return - 1) * 100,
+            "equity": current_equity,
+            "exit_reason": reason,
+            "stop_loss_pct": position["stop_loss_pct"],
+            "highest_profit_pct": highest_profit_pct,
+            "trailing_stop_price": np.nan if trailing_stop_price is None else trailing_stop_price,
+        })
+
+    for i in range(1, len(slope_series) - 1):
+        prev_slope = slope_series.iloc[i - 1]
+        curr_slope = slope_series.iloc[i]
+        date = slope_series.index[i]
+        if date not in price_series or date not in signal_series or date not in stop_loss_series:
+            continue
+
+        buy_signal = prev_slope < 0 and curr_slope >= 0
+        if require_positive_signal:
+            buy_signal = buy_signal and signal_series.loc[date] > 0
+        if buy_signal and position is None:
+            next_date = price_series.index[i + 1]
+            entry_price = price_series.loc[next_date]
+            stop_pct = stop_loss_series.loc[date]
+            position = {
+                "entry_time": next_date,
+                "entry_price": entry_price,
+                "shares": current_equity / entry_price,
+                "stop_loss_price": entry_price * (1 - stop_pct),
+                "stop_loss_pct": stop_pct * 100,
+                "highest_profit_pct": 0.0,
+                "trailing_stop_price": None,
+            }
+
+        if position is not None:
+            entry_price = position["entry_price"]
+            trailing_stop_price = position["trailing_stop_price"]
+            highest_profit_pct = position["highest_profit_pct"]
+            current_price = price_series.loc[date]
+            unrealized_pct = (current_price - entry_price) / entry_price * 100
+            if enable_trailing_take_profit and unrealized_pct >= take_profit_trigger * 100:
+                highest_profit_pct = max(highest_profit_pct, unrealized_pct)
+                new_trailing_stop = entry_price * (1 + take_profit_fraction * highest_profit_pct / 100)
+                if trailing_stop_price is None:
+                    trailing_stop_price = new_trailing_stop
+                else:
+                    trailing_stop_price = max(trailing_stop_price, new_trailing_stop)
+                position["highest_profit_pct"] = highest_profit_pct
+                position["trailing_stop_price"] = trailing_stop_price
+
+            stop_loss_triggered = current_price <= position["stop_loss_price"]
+            trailing_stop_triggered = (enable_trailing_take_profit
+                                       and trailing_stop_price is not None
+                                       and current_price <= trailing_stop_price)
+            slope_sell = prev_slope > 0 and curr_slope <= 0
+            if stop_loss_triggered or trailing_stop_triggered or slope_sell:
+                reason = ("Stop Loss Sell" if stop_loss_triggered
+                          else "Trailing Stop Sell" if trailing_stop_triggered
+                          else "Slope Sell")
+                next_date = price_series.index[i + 1]
+                close(next_date, price_series.loc[next_date], reason,
+                      highest_profit_pct, trailing_stop_price)
+                position = None
+
+    if position is not None:
+        close(price_series.index[-1], price_series.iloc[-1], "Forced Sell",
+              position["highest_profit_pct"], position["trailing_stop_price"])
+    return pd.DataFrame(trades, columns=[
+        "entry_time", "exit_time", "entry_price", "exit_price", "shares", "pnl",
+        "pct_return", "cumulative_pct_return", "equity", "exit_reason", "stop_loss_pct",
+        "highest_profit_pct", "trailing_stop_price",
+    ])
+
+
+def as_reference(trades):
+    frame = trades.to_frame().drop(columns="symbol")
+    frame["exit_reason"] = frame["exit_reason"].astype(str)
+    for name in ("entry_time", "exit_time"):
+        frame[name] = frame[name].astype("datetime64[ns]")
+    return frame.reset_index(drop=True)
+
+
+@pytest.fixture(scope="session")
+def numba_kernel():
+    # Compiled once for the session, outside strategy's LazyJit
+    pytest.importorskip("numba")
+    return jit.LazyJit(strategy._backtest_kernel).get(force=True)
+
+
+@pytest.fixture(params=["search", "numba"])
+def kernel_path(request, monkeypatch):
+    # Forces run_kernel onto the vectorized search or the numba kernel
+    if request.param == "search":
+        monkeypatch.setattr(strategy._backtest_kernel_jit, "get", lambda *args, **kwargs: None)
+    else:
+        monkeypatch.setattr(strategy._backtest_kernel_jit, "compiled",
+                            request.getfixturevalue("numba_kernel"))
+    return request.param
+
+
+# --- Backtest kernels vs the original loop ---
+
+@pytest.mark.parametrize("settings", EXIT_SETTINGS)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_simulate_strategy_matches_reference_loop(seed, settings, kernel_path):
+    price, signal, slope, stop = random_inputs(seed)
+    trades, _ = strategy.simulate_strategy("SYM", price, signal, slope, stop, 10000, **settings)
+    expected = reference_trades(price, signal, slope, stop, 10000, **settings)
+    assert len(expected) > 5
+    pd.testing.assert_frame_equal(as_reference(trades), expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("settings", EXIT_SETTINGS)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_search_matches_numba_kernel_across_calls(seed, settings, numba_kernel):
+    # Chunked calls with position state carried between them, as intraday.py does
+    arrays = strategy._align_inputs(*random_inputs(seed))
+    args = strategy._exit_params(**settings)
+    n = len(arrays[0])
+    states = [strategy.new_position_state(), strategy.new_position_state()]
+    bounds = [1] + sorted(np.random.default_rng(seed).choice(np.arange(2, n - 1), 3, replace=False)) + [n]
+    for first, stop in zip(bounds[:-1], bounds[1:]):
+        chunk = tuple(values[:stop] for values in arrays)
+        expected = numba_kernel(*chunk, first, states[0], *args)
+        actual = strategy._search_backtest(*chunk, first, states[1], *args)
+        for a, b in zip(actual, expected):
+            np.testing.assert_array_equal(a, b)
+        np.testing.assert_array_equal(states[1], states[0])
+
+
+# --- Streaming indicator state vs the batch signal chain ---
+
+@pytest.mark.parametrize("seed", range(4))
+def test_signal_state_matches_compute_signals(seed):
+    close = synthetic_ohlc(1500, seed=seed)["Close"].copy()
+    close.iloc[[50, 51, 700]] = np.nan
+    batch = compute_signals(close, 30, 15, 20)
+    state = SignalState(30, 15, 20)
+    rows = [state.update(float(value)) for value in close]
+    for name in ("volatility", "signal", "smoothed_signal"):
+        np.testing.assert_array_equal([row[name] for row in rows], batch[name].to_numpy())
+    # The batch slope uses running sums; its documented error bound
+    bound = documented_bound(batch["smoothed_signal"].to_numpy(), 20)
+    np.testing.assert_allclose([row["slope"] for row in rows], batch["slope"].to_numpy(),
+                               rtol=0, atol=bound)
+
+
+# --- Chunked streaming backtest vs the whole-history run ---
+
+@pytest.mark.parametrize("chunksize", [1, 7, 250, 5000])
+@pytest.mark.parametrize("seed", range(3))
+def test_stream_backtest_matches_simulate_strategy(seed, chunksize, kernel_path):
+    bars = synthetic_ohlc(3000, seed=seed)
+    params = dict(halflife=20, signal_smooth_halflife=10, slope_window=15)
+    settings = EXIT_SETTINGS[seed % len(EXIT_SETTINGS)]
+    warmup = max(params.values())
+    signals = compute_signals(bars["Close"], params["halflife"], params["signal_smooth_halflife"],
+                              params["slope_window"])
+    expected, _ = strategy.simulate_strategy(
+        "SYM", bars["Open"].iloc[warmup:], signals["smoothed_signal"].iloc[warmup:],
+        signals["slope"].iloc[warmup:], 3.0 * signals["volatility"].iloc[warmup:], 10000,
+        **settings,
+    )
+    logs = []
+    chunks = (bars.iloc[i:i + chunksize] for i in range(0, len(bars), chunksize))
+    summary = stream_backtest(chunks, "SYM", volatility_stop_multiplier=3.0, initial_capital=10000,
+                              sink=logs.append, **params, **settings)
+    actual = pd.concat([log.to_frame() for log in logs], ignore_index=True)
+    expected = expected.to_frame()
+    assert summary["trades"] == len(expected) > 5
+    for name in ("entry_time", "exit_time", "exit_reason", "entry_price", "exit_price"):
+        np.testing.assert_array_equal(actual[name].to_numpy(), expected[name].to_numpy())
+    np.testing.assert_allclose(actual["equity"], expected["equity"], rtol=1e-12)
+
+
+# --- Shared-capital portfolio vs the single-symbol trade log ---
+
+@pytest.mark.parametrize("seed", range(4))
+def test_single_symbol_portfolio_matches_trade_log(seed):
+    bars = synthetic_ohlc(2000, seed=seed)
+    signals = compute_signals(bars["Close"], 20, 10, 15)
+    trades, _ = strategy.simulate_strategy(
+        "SYM", bars["Open"].iloc[20:], signals["smoothed_signal"].iloc[20:],
+        signals["slope"].iloc[20:], 3.0 * signals["volatility"].iloc[20:], 10000,
+        **EXIT_SETTINGS[0],
+    )
+    daily, _ = simulate_portfolio(trades, bars[["Open"]].rename(columns={"Open": "SYM"}),
+                                  bars[["Close"]].rename(columns={"Close": "SYM"}),
+                                  {"SYM": {"initial_capital": 10000}})
+    # Every position is closed by the end, so the book is all cash
+    assert daily["invested"].iloc[-1] == 0
+    np.testing.assert_allclose(daily["equity"].iloc[-1], trades["equity"][-1], rtol=1e-9)
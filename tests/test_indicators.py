@@ -0,0 +1,64 @@
+# tests/test_indicators.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import rolling_slope, rolling_slope_array
+
+
+def polyfit_slope(series, window):
+    # The original implementation: np.polyfit on every window
+    def _slope(x):
+        t = np.arange(len(x))
+        slope, _ = np.polyfit(t, x, 1)
+        return slope
+    return series.rolling(window).apply(_slope, raw=True)
+
+
+def documented_bound(y, window, block_size=4096):
+    # The bound in rolling_slope_array's comment
+    sxx = window * (window * window - 1) / 12.0
+    return 4 * np.finfo(float).eps * block_size ** 2 * np.sqrt(window) * np.nanmax(np.abs(y)) / sxx
+
+
+def random_walk(n, seed, nan_rate=0.01):
+    rng = np.random.default_rng(seed)
+    values = 100 + np.cumsum(rng.normal(size=n))
+    values[rng.random(n) < nan_rate] = np.nan
+    return pd.Series(values, index=pd.bdate_range("2000-01-03", periods=n))
+
+
+@pytest.mark.parametrize("window", [2, 5, 50])
+def test_matches_polyfit_within_documented_bound(window):
+    # Longer than two blocks, with NaN gaps
+    series = random_walk(9000, seed=window)
+    expected = polyfit_slope(series, window)
+    actual = rolling_slope(series, window)
+    pd.testing.assert_index_equal(actual.index, expected.index)
+    np.testing.assert_array_equal(actual.isna(), expected.isna())
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=documented_bound(series, window))
+
+
+@pytest.mark.parametrize("window", [2, 50, 500])
+@pytest.mark.parametrize("offset", [0.0, 1e4, 1e6])
+def test_error_does_not_grow_with_length(window, offset):
+    # Exact window slopes on a long series
+    y = offset + np.cumsum(np.random.default_rng(0).normal(size=200_000))
+    t = np.arange(window) - (window - 1) / 2.0
+    exact = np.lib.stride_tricks.sliding_window_view(y, window) @ t / (t @ t)
+    error = np.abs(rolling_slope_array(y, window)[window - 1:] - exact)
+    assert error.max() <= documented_bound(y, window)
+    head, tail = error[:4096].max(), error[-4096:].max()
+    assert tail <= 10 * max(head, np.finfo(float).eps * np.abs(y).max())
+
+
+def test_dataframe_matches_per_column_series():
+    frame = pd.DataFrame({f"S{i}": random_walk(3000, seed=i) for i in range(4)})
+    slopes = rolling_slope(frame, 20)
+    for column in frame:
+        pd.testing.assert_series_equal(slopes[column], rolling_slope(frame[column], 20))
+
+
+def test_short_input_is_all_nan():
+    assert np.isnan(rolling_slope_array(np.arange(4.0), 5)).all()
+    assert np.isnan(rolling_slope_array(np.arange(10.0), 1)).all()
@@ -0,0 +1,113 @@
+# tests/test_result_store.py
+import os
+
+import numpy as np
+import pytest
+
+import result_store
+import strategy
+from result_store import ResultStore
+from trades import TRADE_COLUMNS
+
+from test_equivalence import EXIT_SETTINGS, random_inputs
+
+
+def stored_bytes(store):
+    return sum(size for _, size, _ in store.entries())
+
+
+def assert_same_result(a, b):
+    trades_a, payload_a = a
+    trades_b, payload_b = b
+    assert list(trades_a.symbols) == list(trades_b.symbols)
+    for name in TRADE_COLUMNS:
+        np.testing.assert_array_equal(trades_a[name], trades_b[name])
+    for name in strategy.PAYLOAD_ARRAYS:
+        np.testing.assert_array_equal(payload_a[name], payload_b[name])
+
+
+def test_put_get_round_trip(tmp_path):
+    store = ResultStore(str(tmp_path))
+    arrays = {"x": np.arange(5.0), "codes": np.array([1, 2], dtype=np.int8)}
+    store.put("ab" * 20, arrays, {"symbols": ["A"]})
+    got, meta = store.get("ab" * 20)
+    assert meta == {"symbols": ["A"]}
+    for name, values in arrays.items():
+        np.testing.assert_array_equal(got[name], values)
+        assert got[name].dtype == values.dtype
+    assert store.get("cd" * 20) is None
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_simulate_strategy_reads_back_stored_run(tmp_path):
+    store = ResultStore(str(tmp_path))
+    price, signal, slope, stop = random_inputs(0)
+    args = ("SYM", price, signal, slope, stop, 10000)
+    fresh = strategy.simulate_strategy(*args, **EXIT_SETTINGS[0])
+    first = strategy.simulate_strategy(*args, **EXIT_SETTINGS[0], store=store)
+    again = strategy.simulate_strategy(*args, **EXIT_SETTINGS[0], store=store)
+    assert (store.hits, store.misses) == (1, 1)
+    assert_same_result(first, fresh)
+    assert_same_result(again, fresh)
+
+    # Different exit parameters are a different entry
+    strategy.simulate_strategy(*args, **EXIT_SETTINGS[1], store=store)
+    assert store.misses == 2
+
+
+def test_simulate_universe_shares_entries_with_simulate_strategy(tmp_path):
+    store = ResultStore(str(tmp_path))
+    tasks = []
+    for seed in range(3):
+        price, signal, slope, stop = random_inputs(seed)
+        tasks.append(dict(symbol=f"S{seed}", price_series=price, signal_series=signal,
+                          slope_series=slope, stop_loss_series=stop, initial_capital=10000,
+                          **EXIT_SETTINGS[0]))
+    strategy.simulate_strategy(**tasks[0], store=store)
+    results = strategy.simulate_universe(tasks, max_workers=2, store=store)
+    assert store.hits == 1
+    for task, result in zip(tasks, results):
+        assert_same_result(result, strategy.simulate_strategy(**task))
+    assert len(store.entries()) == 3
+
+
+def test_eviction_keeps_store_under_max_bytes(tmp_path):
+    arrays = {"x": np.random.default_rng(0).normal(size=256)}
+    probe = ResultStore(str(tmp_path / "probe"))
+    probe.put("00" * 20, arrays, {})
+    entry_size = stored_bytes(probe)
+
+    store = ResultStore(str(tmp_path / "store"), max_bytes=10 * entry_size)
+    for i in range(40):
+        store.put(f"{i:040x}", arrays, {})
+        assert stored_bytes(store) <= store.max_bytes
+    # The most recent writes survive
+    assert store.get(f"{39:040x}") is not None
+    assert store.get(f"{0:040x}") is None
+
+
+def test_put_does_not_scan_the_store(tmp_path, monkeypatch):
+    store = ResultStore(str(tmp_path))
+    arrays = {"x": np.arange(10.0)}
+    store.put("00" * 20, arrays, {})
+    scans = []
+    entries = ResultStore.entries
+    monkeypatch.setattr(ResultStore, "entries", lambda self: scans.append(1) or entries(self))
+    for i in range(1, 200):
+        store.put(f"{i:040x}", arrays, {})
+    assert not scans
+
+
+def test_other_processes_writes_are_picked_up_on_rescan(tmp_path, monkeypatch):
+    # Another process's writes only show up at the next scan
+    monkeypatch.setattr(result_store, "RESCAN_EVERY", 5)
+    arrays = {"x": np.arange(10.0)}
+    store = ResultStore(str(tmp_path))
+    store.put("00" * 20, arrays, {})
+    other = os.path.join(store.directory, "ff", "ff" * 20 + ".npz")
+    os.makedirs(os.path.dirname(other))
+    with open(other, "wb") as f:
+        f.write(b"\0" * 10000)
+    for i in range(1, 6):
+        store.put(f"{i:040x}", arrays, {})
+    assert result_store._sizes[store.directory][0] == pytest.approx(stored_bytes(store))
@@ -0,0 +1,63 @@
+# tests/test_scanner.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from data import price_panel
+from indicators import rolling_slope
+from scanner import scan_lookback, scan_universe
+from signal_engine import compute_signals
+from synthetic import synthetic_universe
+
+PARAMS = (100, 100, 50)
+
+
+@pytest.fixture(scope="module")
+def close():
+    frames = synthetic_universe(40, 6000, seed=7)
+    close = price_panel(frames, "Close")
+    # A late listing and a gap
+    close.iloc[:5000, 3] = np.nan
+    close.iloc[5990:5993, 5] = np.nan
+    return close
+
+
+@pytest.fixture(scope="module")
+def full_history(close):
+    smoothed = compute_signals(close, *PARAMS[:2], PARAMS[2],
+                               outputs=("smoothed_signal",))["smoothed_signal"]
+    return smoothed, rolling_slope(smoothed, PARAMS[2])
+
+
+def test_default_lookback_matches_full_history(close, full_history):
+    smoothed, slope = full_history
+    assert scan_lookback(*PARAMS) < len(close)
+    for end in range(len(close) - 30, len(close) + 1):
+        state = scan_universe(close.iloc[:end], *PARAMS, block_size=16)["state"]
+        # The accuracy claimed in the --lookback help
+        atol = 1e-9 * np.nanmax(np.abs(smoothed.iloc[end - 1]))
+        np.testing.assert_allclose(state["smoothed_signal"], smoothed.iloc[end - 1],
+                                   rtol=0, atol=atol)
+        np.testing.assert_allclose(state["prev_slope"], slope.iloc[end - 2], rtol=0, atol=atol)
+        np.testing.assert_allclose(state["slope"], slope.iloc[end - 1], rtol=0, atol=atol)
+
+
+def test_crossings_and_top_match_full_history(close, full_history):
+    smoothed, slope = full_history
+    crossings = 0
+    for end in range(len(close) - 30, len(close) + 1):
+        result = scan_universe(close.iloc[:end], *PARAMS, top_k=5, block_size=16)
+        prev, curr = slope.iloc[end - 2], slope.iloc[end - 1]
+        expected = np.select([(prev < 0) & (curr >= 0), (prev > 0) & (curr <= 0)],
+                             ["buy", "sell"], default="")
+        np.testing.assert_array_equal(result["state"]["crossing"], expected)
+        crossings += len(result["crossings"])
+
+        top = smoothed.iloc[end - 1].dropna().sort_values(ascending=False).index[:5]
+        assert list(result["top"].index) == list(top)
+    assert crossings > 0
+
+
+def test_unknown_rank_field_is_rejected(close):
+    with pytest.raises(ValueError, match="rank_by"):
+        scan_universe(close, *PARAMS, rank_by="volatility")
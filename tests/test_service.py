@@ -0,0 +1,89 @@
+# tests/test_service.py
+import asyncio
+import json
+
+import pytest
+
+from service import SignalService
+from synthetic import synthetic_source
+
+
+async def exchange(port, raw):
+    # One raw request; returns (status, JSON payload, Connection header)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    status_line = await reader.readline()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers["content-length"]))
+    writer.close()
+    return int(status_line.split()[1]), json.loads(body), headers["connection"]
+
+
+def post(body, length=None):
+    body = body if isinstance(body, bytes) else json.dumps(body).encode()
+    length = len(body) if length is None else length
+    return (f"POST /signals HTTP/1.1\r\nHost: x\r\nContent-Length: {length}\r\n\r\n").encode() + body
+
+
+def run(requests):
+    async def main():
+        service = SignalService(synthetic_source(n_bars=500), 20, 10, 15, start_date="2000-01-01",
+                                refresh_interval=3600)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return [await exchange(port, raw) for raw in requests]
+        finally:
+            server.close()
+            service.close()
+    return asyncio.run(main())
+
+
+def test_signals_for_a_batch():
+    (status, payload, _), = run([post({"symbols": ["AAA", "BBB"], "bars": 3})])
+    assert status == 200
+    assert set(payload["signals"]) == {"AAA", "BBB"}
+    assert len(payload["signals"]["AAA"]["history"]) == 3
+
+
+@pytest.mark.parametrize("body", [
+    [],
+    "AAA",
+    {"symbols": "AAA"},
+    {"symbols": ["AAA", 1]},
+    {"symbols": ["AAA"], "bars": "3"},
+    {"symbols": ["AAA"], "bars": True},
+    {"symbols": ["AAA"], "bars": -3},
+    {"symbols": ["AAA"], "bars": 1.5},
+    {"symbols": []},
+])
+def test_bad_post_bodies_are_rejected(body):
+    (status, payload, connection), = run([post(body)])
+    assert status == 400 and "error" in payload
+    assert connection == "keep-alive"
+
+
+def test_invalid_json_is_rejected():
+    (status, _, _), = run([post(b"{not json")])
+    assert status == 400
+
+
+@pytest.mark.parametrize("query", ["bars=-3", "bars=x", "bars=1.5"])
+def test_bad_get_bars_are_rejected(query):
+    raw = f"GET /signals?symbols=AAA&{query} HTTP/1.1\r\nHost: x\r\n\r\n".encode()
+    (status, _, _), = run([raw])
+    assert status == 400
+
+
+@pytest.mark.parametrize("length", ["-1", "abc", "1e3", "+5"])
+def test_bad_content_length_closes_the_connection(length):
+    (status, payload, connection), = run([post(b"{}", length=length)])
+    assert status == 400 and "Content-Length" in payload["error"]
+    assert connection == "close"
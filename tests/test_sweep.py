@@ -0,0 +1,48 @@
+# tests/test_sweep.py
+import pandas as pd
+
+import sweep
+from data import price_panel
+from synthetic import synthetic_universe
+
+GRID = dict(
+    halflife=[30], signal_smooth_halflife=[20], slope_window=[10],
+    volatility_stop_multiplier=[2, 4], require_positive_signal=[False],
+    enable_trailing_take_profit=[True], take_profit_trigger=[0.02, 0.05, 0.1],
+    take_profit_fraction=[0.25, 0.5],
+)
+
+
+class RecordingPool:
+    # In-process stand-in for ProcessPoolExecutor that records the tasks
+    tasks = []
+
+    def __init__(self, max_workers=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, func, tasks):
+        tasks = list(tasks)
+        RecordingPool.tasks.append(tasks)
+        return map(func, tasks)
+
+
+def test_exit_grid_is_split_across_workers(monkeypatch):
+    frames = synthetic_universe(2, 600)
+    close, open_ = price_panel(frames, "Close"), price_panel(frames, "Open")
+    serial = sweep.run_sweep(close, open_, GRID, max_workers=1)
+
+    RecordingPool.tasks = []
+    monkeypatch.setattr(sweep, "ProcessPoolExecutor", RecordingPool)
+    pooled = sweep.run_sweep(close, open_, GRID, max_workers=4)
+
+    # 12 exit combinations on one indicator set: 4 chunks of 3
+    (tasks,) = RecordingPool.tasks
+    assert [len(combos) for _, combos, _ in tasks] == [3, 3, 3, 3]
+    assert len(serial) == 12
+    pd.testing.assert_frame_equal(pooled, serial)
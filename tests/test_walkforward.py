@@ -0,0 +1,51 @@
+# tests/test_walkforward.py
+import pytest
+
+from data import price_panel
+from synthetic import synthetic_universe
+from walkforward import run_walk_forward, walk_forward_folds
+
+GRID = dict(
+    halflife=[20], signal_smooth_halflife=[10], slope_window=[10, 20],
+    volatility_stop_multiplier=[3], require_positive_signal=[False],
+    enable_trailing_take_profit=[True], take_profit_trigger=[0.05, 0.1],
+    take_profit_fraction=[0.5],
+)
+
+
+def test_default_step_tiles_test_windows():
+    folds = walk_forward_folds(1000, 300, 200, start=50)
+    assert folds == [(50, 350, 550), (250, 550, 750), (450, 750, 950), (650, 950, 1000)]
+    for (_, _, test_end), (_, next_train_end, _) in zip(folds, folds[1:]):
+        assert test_end == next_train_end
+
+
+def test_longer_step_leaves_gaps_between_test_windows():
+    folds = walk_forward_folds(1000, 300, 100, step_bars=250)
+    assert [(train_end, test_end) for _, train_end, test_end in folds] == [
+        (300, 400), (550, 650), (800, 900)]
+
+
+def test_overlapping_test_windows_are_rejected():
+    with pytest.raises(ValueError, match="step_bars"):
+        walk_forward_folds(1000, 300, 200, step_bars=100)
+    frames = synthetic_universe(1, 1000)
+    with pytest.raises(ValueError, match="step_bars"):
+        run_walk_forward(price_panel(frames, "Close"), price_panel(frames, "Open"), GRID,
+                         train_bars=300, test_bars=200, step_bars=100, max_workers=1)
+
+
+def test_out_of_sample_trades_stay_in_their_test_windows():
+    frames = synthetic_universe(2, 1500)
+    close, open_ = price_panel(frames, "Close"), price_panel(frames, "Open")
+    folds, trades, curve = run_walk_forward(close, open_, GRID, train_bars=500, test_bars=250,
+                                            max_workers=1)
+    df = trades.to_frame()
+    assert len(df) > 0
+    for fold in folds.itertuples():
+        assert fold.test_start > fold.train_end
+    starts = folds["test_start"].to_numpy()
+    assert (starts[1:] > folds["test_end"].to_numpy()[:-1]).all()
+    assert df["entry_time"].min() >= starts[0]
+    # The equity curve spans the out-of-sample history only
+    assert curve.index[0] == starts[0] and curve.index[-1] == close.index[-1]
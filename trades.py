@@ -0,0 +1,110 @@
+# trades.py
+import numpy as np
+import pandas as pd
+
+# Exit reason codes
+STOP_LOSS, TRAILING_STOP, SLOPE_SELL, FORCED_SELL = 0, 1, 2, 3
+
+EXIT_REASONS = {
+    STOP_LOSS: "Stop Loss Sell",
+    TRAILING_STOP: "Trailing Stop Sell",
+    SLOPE_SELL: "Slope Sell",
+    FORCED_SELL: "Forced Sell",
+}
+
+# Column name -> dtype. Symbols and exit reasons are stored as small integer
+# codes into TradeLog.symbols / EXIT_REASONS; a missing trailing stop is NaN.
+TRADE_COLUMNS = {
+    "symbol": np.int32,
+    "entry_time": "datetime64[us]",
+    "exit_time": "datetime64[us]",
+    "entry_price": np.float64,
+    "exit_price": np.float64,
+    "shares": np.float64,
+    "pnl": np.float64,
+    "pct_return": np.float64,
+    "cumulative_pct_return": np.float64,
+    "equity": np.float64,
+    "exit_reason": np.int8,
+    "stop_loss_pct": np.float64,
+    "highest_profit_pct": np.float64,
+    "trailing_stop_price": np.float64,
+}
+
+
+class TradeLog:
+    # Columnar trade record backed by preallocated NumPy buffers that grow
+    # geometrically, so appending millions of trades never builds Python dicts.
+    def __init__(self, capacity=64):
+        self.symbols = []
+        self._symbol_codes = {}
+        self._size = 0
+        self._buffers = {
+            name: np.empty(capacity, dtype=dtype) for name, dtype in TRADE_COLUMNS.items()
+        }
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, name):
+        return self._buffers[name][:self._size]
+
+    def symbol_code(self, symbol):
+        if symbol not in self._symbol_codes:
+            self._symbol_codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return self._symbol_codes[symbol]
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        capacity = len(self._buffers["pnl"])
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity)
+        for name, buffer in self._buffers.items():
+            grown = np.empty(capacity, dtype=buffer.dtype)
+            grown[:self._size] = buffer[:self._size]
+            self._buffers[name] = grown
+
+    def append_columns(self, symbol, **columns):
+        # Bulk append for one symbol; every column in TRADE_COLUMNS except
+        # "symbol" must be given as an equal-length array
+        count = len(columns["pnl"])
+        self._reserve(count)
+        start, stop = self._size, self._size + count
+        self._buffers["symbol"][start:stop] = self.symbol_code(symbol)
+        for name in TRADE_COLUMNS:
+            if name != "symbol":
+                self._buffers[name][start:stop] = columns[name]
+        self._size = stop
+
+    def extend(self, other):
+        for code, symbol in enumerate(other.symbols):
+            rows = other["symbol"] == code
+            self.append_columns(symbol, **{
+                name: other[name][rows] for name in TRADE_COLUMNS if name != "symbol"
+            })
+
+    @classmethod
+    def concat(cls, logs):
+        out = cls(capacity=sum(len(log) for log in logs))
+        for log in logs:
+            out.extend(log)
+        return out
+
+    def to_frame(self):
+        data = {name: self[name] for name in TRADE_COLUMNS}
+        data["symbol"] = pd.Categorical.from_codes(data["symbol"], categories=self.symbols)
+        data["exit_reason"] = pd.Categorical.from_codes(
+            data["exit_reason"], categories=[EXIT_REASONS[code] for code in sorted(EXIT_REASONS)]
+        )
+        return pd.DataFrame(data)
+
+    def records(self):
+        # List of per-trade dicts, the format run_strategy used to return
+        frame = self.to_frame().astype({"symbol": object, "exit_reason": object})
+        records = frame.to_dict("records")
+        for record in records:
+            if np.isnan(record["trailing_stop_price"]):
+                record["trailing_stop_price"] = None
+        return records
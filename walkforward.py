@@ -0,0 +1,144 @@
+# walkforward.py
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from sweep import INDICATOR_PARAMS, IndicatorCache, expand_grid, run_combo
+from trades import TradeLog
+
+
+def walk_forward_folds(n_bars, train_bars, test_bars, step_bars=None, start=0):
+    # Rolling (train_start, train_end, test_end) bar positions. With the default
+    # step the test windows tile the history. A step shorter than the test
+    # window would overlap test windows and chain their trades twice.
+    step_bars = step_bars or test_bars
+    if step_bars < test_bars:
+        raise ValueError(f"step_bars ({step_bars}) must be at least test_bars ({test_bars}) "
+                         "so out-of-sample windows don't overlap")
+    folds = []
+    train_start = start
+    while train_start + train_bars < n_bars:
+        train_end = train_start + train_bars
+        folds.append((train_start, train_end, min(train_end + test_bars, n_bars)))
+        train_start += step_bars
+    return folds
+
+
+def _slice_inputs(inputs, start, stop):
+    return tuple(frame.iloc[start:stop] for frame in inputs)
+
+
+def _train_task(task):
+    fold, inputs, combos, initial_capital = task
+    return [
+        {"fold": fold, "combo_id": combo_id, **run_combo(inputs, combo, initial_capital)[0]}
+        for combo_id, combo in combos
+    ]
+
+
+def chain_trades(logs, initial_capital):
+    # Concatenates per-fold trade logs and re-compounds equity, shares and PnL so
+    # each symbol follows one continuous out-of-sample path
+    chained = TradeLog.concat(logs)
+    for code in range(len(chained.symbols)):
+        rows = np.flatnonzero(chained["symbol"] == code)
+        entry_price = chained["entry_price"][rows]
+        exit_price = chained["exit_price"][rows]
+        growth = 1 + chained["pct_return"][rows] / 100
+        equity = np.cumprod(np.concatenate(([float(initial_capital)], growth)))
+        shares = equity[:-1] / entry_price
+
+        chained["shares"][rows] = shares
+        chained["pnl"][rows] = shares * (exit_price - entry_price)
+        chained["equity"][rows] = equity[1:]
+        chained["cumulative_pct_return"][rows] = (equity[1:] / initial_capital - 1) * 100
+    return chained
+
+
+def equity_curve(trades, index, symbols, initial_capital):
+    # Portfolio value on every bar of `index`: each symbol's equity after its
+    # latest exit (initial capital before the first one), summed
+    if not len(trades):
+        return pd.Series(float(initial_capital * len(symbols)), index=index, name="equity")
+    df = trades.to_frame()
+    df["symbol"] = df["symbol"].astype(object)
+    points = df.pivot_table(index="exit_time", columns="symbol", values="equity", aggfunc="last")
+    curve = points.reindex(index=index, columns=symbols).ffill().fillna(initial_capital)
+    return curve.sum(axis=1).rename("equity")
+
+
+def run_walk_forward(price_close, price_open, grid, train_bars, test_bars, step_bars=None,
+                     metric="return_pct", initial_capital=10000, max_workers=None):
+    # Picks the best `grid` combination on each training window (by `metric`)
+    # and trades it on the following test window. Indicators are computed once
+    # over the full history and sliced per fold, so overlapping windows share
+    # them; every (fold, indicator set) pair runs as its own pool task.
+    # Returns (folds DataFrame, chained out-of-sample TradeLog, equity curve).
+    if isinstance(price_close, pd.Series):
+        price_close, price_open = price_close.to_frame(), price_open.to_frame()
+
+    combos = expand_grid(grid)
+    groups = {}
+    for combo_id, combo in enumerate(combos):
+        key = tuple(combo[name] for name in INDICATOR_PARAMS)
+        groups.setdefault(key, []).append((combo_id, combo))
+
+    # Start the first fold once every indicator set is warmed up
+    warmup = max(max(key) for key in groups)
+    folds = walk_forward_folds(len(price_close), train_bars, test_bars, step_bars, start=warmup)
+    if not folds:
+        raise ValueError("History is too short for a single walk-forward fold")
+
+    cache = IndicatorCache(price_close)
+    inputs = {
+        (hl, shl, window): (
+            price_open,
+            cache.smoothed_signal(hl, shl),
+            cache.slope(hl, shl, window),
+            cache.volatility(hl),
+        )
+        for hl, shl, window in groups
+    }
+
+    tasks = [
+        (fold, _slice_inputs(inputs[key], train_start, train_end), group, initial_capital)
+        for fold, (train_start, train_end, _) in enumerate(folds)
+        for key, group in groups.items()
+    ]
+    if max_workers == 1:
+        results = list(map(_train_task, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_train_task, tasks))
+    train = pd.DataFrame([row for rows in results for row in rows])
+
+    # --- Out-of-sample: each fold's best combination on its test window ---
+    best = train.loc[train.groupby("fold", sort=True)[metric].idxmax()]
+    fold_rows = []
+    test_logs = []
+    for (_, chosen), (train_start, train_end, test_end) in zip(best.iterrows(), folds):
+        combo = combos[int(chosen["combo_id"])]
+        key = tuple(combo[name] for name in INDICATOR_PARAMS)
+        test_row, trades = run_combo(
+            _slice_inputs(inputs[key], train_end, test_end), combo, initial_capital
+        )
+        test_logs.append(trades)
+
+        index = price_close.index
+        fold_rows.append({
+            "fold": int(chosen["fold"]),
+            "train_start": index[train_start],
+            "train_end": index[train_end - 1],
+            "test_start": index[train_end],
+            "test_end": index[test_end - 1],
+            **combo,
+            f"train_{metric}": chosen[metric],
+            "test_return_pct": test_row["return_pct"],
+            "test_trades": test_row["trades"],
+        })
+
+    oos_trades = chain_trades(test_logs, initial_capital)
+    test_index = price_open.index[folds[0][1]:folds[-1][2]]
+    curve = equity_curve(oos_trades, test_index, list(price_close.columns), initial_capital)
+    return pd.DataFrame(fold_rows), oos_trades, curve